@@ -0,0 +1,244 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEventLoop, QSize, QTimer, qVersion
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtWidgets import QApplication, QGraphicsScene
+
+from engine.cache import cache_filename
+from engine.match import RandomAnswerProvider, RandomDice
+from gameofthegoose import Game, Team
+from gameofthegoose.turns import TurnMachine
+from gui.resources import register_resources
+
+BOX_COUNTS = [27, 1000, 10000]
+
+# Boxes the tokens move across in the animation benchmark
+ANIMATION_STEPS = 40
+
+# Longest side of the image the whole scene is rendered to
+RENDER_SIZE = 4096
+
+Metric = Dict[str, Any]
+
+
+def write_board(filename: str, count: int, seed: int = 0):
+    '''Synthetic board with the box kinds in random order between start and finish'''
+    rnd = random.Random(seed)
+    with open(filename, "w", encoding="utf-8") as file:
+        file.write('<?xml version="1.0" encoding="utf-8"?>\n<game>\n\t<start />\n')
+        for i in range(count - 2):
+            kind = rnd.choice(["quiz", "quiz", "challenge", "rollthediceagain", "skiptheturn"])
+            if kind == "quiz":
+                right = rnd.randrange(4)
+                file.write('\t<quiz question="Question {}?">\n'.format(i))
+                for a in range(4):
+                    file.write('\t\t<answer text="Answer {}{}" />\n'.format(a, " *" if a == right else ""))
+                file.write('\t</quiz>\n')
+            elif kind == "challenge":
+                file.write('\t<challenge text="Challenge {}" />\n'.format(i))
+            else:
+                file.write('\t<{} />\n'.format(kind))
+        file.write('\t<finish />\n</game>\n')
+
+
+def measure(function: Callable[[], Any], repeat: int) -> float:
+    '''Median wall time of the function, in milliseconds'''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def new_game(filename: str, teams: int) -> Game:
+    game = Game()
+    game.load(filename)
+    for i in range(teams):
+        team = Team()
+        team.set_name("Team {}".format(i))
+        game.add_team(team)
+    return game
+
+
+def play_turns(game: Game, turns: int, seed: int):
+    '''Plays turns through the turn machine, answering in place of the dialogs'''
+    dice = RandomDice(seed)
+    answers = RandomAnswerProvider(seed=seed + 1)
+    machine = game.turns()
+    for _ in range(turns):
+        game.next()
+        while machine.state() != TurnMachine.State.IDLE:
+            team = game.match().current_team()
+            if machine.state() == TurnMachine.State.ROLLING:
+                machine.provide(dice.roll(team))
+            elif machine.state() == TurnMachine.State.ANSWERING_QUIZ:
+                machine.provide(answers.quiz_result(team, None))
+            else:
+                machine.provide(answers.challenge_result(team, None))
+        game.animator().finish()
+        if game.match().winner() is not None:
+            break
+
+
+def animate(game: Game, steps: int) -> Dict[str, float]:
+    '''Moves every token along the first boxes of the board on the real clock, returns the frame stats'''
+    animator = game.animator()
+    animator.reset_stats()
+    tokens = [game.team(state) for state in game.match().teams()]
+    waypoints = [box.waypoint() for box in game.boxes()[:steps]]
+    for token in tokens:
+        animator.move(token, waypoints)
+
+    loop = QEventLoop()
+
+    def check():
+        if not any(animator.is_moving(token) for token in tokens):
+            loop.quit()
+
+    poll = QTimer()
+    poll.timeout.connect(check)
+    poll.start(20)
+    loop.exec()
+    poll.stop()
+    return animator.stats()
+
+
+def render(scene: QGraphicsScene) -> QImage:
+    rect = scene.itemsBoundingRect()
+    scale = RENDER_SIZE / max(rect.width(), rect.height(), 1)
+    image = QImage(QSize(max(1, int(rect.width() * scale)), max(1, int(rect.height() * scale))),
+                   QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(0)
+    painter = QPainter(image)
+    scene.render(painter, source=rect)
+    painter.end()
+    return image
+
+
+def run(directory: str, counts: List[int], teams: int, turns: int, repeat: int) -> Dict[str, Metric]:
+    results: Dict[str, Metric] = {}
+
+    def add(name: str, value: float, unit: str, better: str = "lower"):
+        results[name] = {"value": round(value, 3), "unit": unit, "better": better}
+        logging.info("%-28s %12.3f %s", name, value, unit)
+
+    viewport = QSize(1920, 1080)
+    for count in counts:
+        filename = os.path.join(directory, "board_{}.xml".format(count))
+        write_board(filename, count)
+
+        def cold_load():
+            if os.path.exists(cache_filename(filename)):
+                os.remove(cache_filename(filename))
+            Game().load(filename)
+
+        add("load_cold/{}".format(count), measure(cold_load, repeat), "ms")
+        add("load_cached/{}".format(count), measure(lambda: Game().load(filename), repeat), "ms")
+
+        def init_graphics():
+            new_game(filename, teams).init_graphics(viewport)
+
+        add("init_graphics/{}".format(count), measure(init_graphics, repeat), "ms")
+
+        game = new_game(filename, teams)
+        game.init_graphics(viewport)
+        scene = QGraphicsScene()
+        scene.addItem(game)
+        add("scene_items/{}".format(count), len(scene.items()), "items")
+        add("layer_items/{}".format(count), len(game.layer().static_scene().items()), "items")
+
+        add("render_cold/{}".format(count), measure(lambda: render(scene), 1), "ms")
+        add("render/{}".format(count), measure(lambda: render(scene), repeat), "ms")
+
+        stats = animate(game, ANIMATION_STEPS)
+        add("frame_work_mean/{}".format(count), stats["mean_work_ms"], "ms")
+        add("frame_work_max/{}".format(count), stats["max_work_ms"], "ms")
+        add("frames_skipped/{}".format(count), stats["skipped_frames"], "frames")
+        add("frames_over_budget/{}".format(count), stats["over_budget_frames"], "frames")
+
+        # Short boards are won quickly, new matches are started until enough turns were played
+        played = 0
+        elapsed = 0.0
+        while True:
+            start = time.perf_counter()
+            play_turns(game, turns - played, seed=count + played)
+            elapsed += time.perf_counter() - start
+            played += game.match().turn()
+            if played >= turns:
+                break
+            scene.removeItem(game)
+            game = new_game(filename, teams)
+            game.init_graphics(viewport)
+            scene.addItem(game)
+        add("turns_per_second/{}".format(count), played / elapsed, "turns/s", "higher")
+
+        scene.removeItem(game)
+    return results
+
+
+def compare(results: Dict[str, Metric], baseline: Dict[str, Metric], tolerance: float) -> List[str]:
+    '''Metrics worse than the baseline by more than the tolerance'''
+    regressions = []
+    for name, metric in results.items():
+        if (name not in baseline) or (metric["unit"] == "items"):
+            continue
+        old = baseline[name]["value"]
+        new = metric["value"]
+        if metric["better"] == "lower":
+            ratio = new / old if old > 0 else 1.0
+        else:
+            ratio = old / new if new > 0 else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "REGRESSION"
+        logging.info("%-28s %12.3f -> %12.3f %s  %+6.1f%% %s", name, old, new, metric["unit"], (ratio - 1) * 100, flag)
+    return regressions
+
+
+'''Benchmarks of the load, layout, turn and render paths, runs offscreen'''
+if __name__ == "__main__":
+
+    logging.basicConfig(format='%(asctime)s %(threadName)s %(module)s: %(message)s', level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Benchmark the board load, layout, turns and rendering")
+    parser.add_argument("--boxes", type=int, nargs="+", default=BOX_COUNTS, help="synthetic board sizes")
+    parser.add_argument("--teams", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=2000, help="turns played per board, at most")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per timing, the median is kept")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="JSON results")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="slowdown accepted before failing, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    register_resources()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(directory, args.boxes, args.teams, args.turns, args.repeat)
+
+    report = {"python": platform.python_version(),
+              "qt": qVersion(),
+              "platform": platform.platform(),
+              "results": results}
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance)
+        if regressions:
+            sys.exit("{} regressions: {}".format(len(regressions), ", ".join(regressions)))
@@ -0,0 +1,9 @@
+from engine.rules import Quiz, QuizNotFound, Challenge, Result, Request, BoxRule, StartRule, FinishRule, QuizRule, \
+    BankQuizRule, ChallengeRule, SkipTurnRule, RollTheDiceAgainRule, MoveRule, WarpRule, GoBackRule
+from engine.boxtypes import BoxType, BoxTypes, box_types, register_box_type
+from engine.board import Board
+from engine.match import Match, TeamState, Dice, RandomDice, AnswerProvider, RandomAnswerProvider, Listener
+from engine.simulator import Simulator, SimulationResult
+from engine.markov import MarkovChain
+from engine.eventlog import EventLog, LogContents, read_log, replay
+from engine.quizbank import BankQuiz, QuizBank, QuizSampler, build_bank, open_bank
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import os
+import struct
+from typing import List, Optional, Tuple, Dict
+from logging import getLogger
+from xml.parsers import expat
+
+from engine.boxtypes import BoxTypes, box_types
+from engine.cache import Record, file_digest, read_cache, write_cache
+from engine.rules import BankQuizRule, BoxRule, Quiz, QuizNotFound
+
+logging = getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_answer(text: str) -> Tuple[str, bool]:
+    '''Right answers end with " *"'''
+    if text.endswith("*"):
+        return text[:-2], True
+    return text, False
+
+
+class _QuizRead(Exception):
+    pass
+
+
+# Size and modification time of a file, to notice it changed since it was loaded
+Stamp = Tuple[int, int]
+
+
+def file_stamp(filename: str) -> Stamp:
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _Found(Exception):
+    pass
+
+
+def find_element(filename: str, tag: str, ordinal: int) -> int:
+    '''Byte offset of the box element of the board file that is the ordinal-th with the given tag'''
+    depth = 0
+    count = 0
+
+    def start_element(name: str, attrs: Dict[str, str]):
+        nonlocal depth, count
+        depth += 1
+        if (depth == 2) and (name == tag):
+            if count == ordinal:
+                raise _Found(parser.CurrentByteIndex)
+            count += 1
+
+    def end_element(name: str):
+        nonlocal depth
+        depth -= 1
+
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    try:
+        with open(filename, "rb") as file:
+            parser.ParseFile(file)
+    except _Found as e:
+        return e.args[0]
+    except (OSError, expat.ExpatError) as e:
+        raise QuizNotFound("Cannot read {}: {}".format(filename, e))
+    raise QuizNotFound("No <{}> number {} in {}".format(tag, ordinal + 1, filename))
+
+
+def read_quiz(filename: str, offset: int, encoding: Optional[str] = None) -> Quiz:
+    '''Parses the quiz element starting at the given byte offset of a board file'''
+    question = None
+    answers = []
+    right_answers = []
+
+    def start_element(name: str, attrs: Dict[str, str]):
+        nonlocal question
+        if question is None:
+            if name != "quiz":
+                raise QuizNotFound("No quiz at offset {} of {}".format(offset, filename))
+            question = attrs.get("question", "")
+        elif name == "answer":
+            answer, right = parse_answer(attrs.get("text", ""))
+            answers.append(answer)
+            right_answers.append(right)
+
+    def end_element(name: str):
+        if name == "quiz":
+            raise _QuizRead()
+
+    parser = expat.ParserCreate(encoding)
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    try:
+        with open(filename, "rb") as file:
+            file.seek(offset)
+            chunk = file.read(CHUNK_SIZE)
+            while chunk:
+                parser.Parse(chunk, False)
+                chunk = file.read(CHUNK_SIZE)
+            parser.Parse(b"", True)
+    except _QuizRead:
+        pass
+    except (OSError, expat.ExpatError) as e:
+        raise QuizNotFound("Cannot read quiz at offset {} of {}: {}".format(offset, filename, e))
+    if question is None:
+        raise QuizNotFound("No quiz at offset {} of {}".format(offset, filename))
+    return Quiz(question, answers, right_answers)
+
+
+class LazyQuiz(Quiz):
+    '''Quiz read from the board file the first time it is needed.
+
+    If the file changed since the board was loaded, the quiz is looked for
+    again by its ordinal among the quizzes of the board, as its offset may
+    have moved.
+    '''
+
+    __slots__ = ("__filename", "__offset", "__encoding", "__ordinal", "__stamp", "__quiz")
+
+    def __init__(self, filename: str, offset: int, encoding: Optional[str] = None, ordinal: int = 0,
+                 stamp: Optional[Stamp] = None):
+        self.__filename = filename
+        self.__offset = offset
+        self.__encoding = encoding
+        self.__ordinal = ordinal
+        self.__stamp = stamp
+        self.__quiz: Optional[Quiz] = None
+
+    def __load(self) -> Quiz:
+        if self.__quiz is None:
+            if self.__stamp is not None:
+                try:
+                    stamp = file_stamp(self.__filename)
+                except OSError as e:
+                    raise QuizNotFound("Cannot read {}: {}".format(self.__filename, e))
+                if stamp != self.__stamp:
+                    logging.info("%s changed since it was loaded, looking for quiz %d again",
+                                 self.__filename, self.__ordinal + 1)
+                    self.__offset = find_element(self.__filename, "quiz", self.__ordinal)
+                    self.__stamp = stamp
+            self.__quiz = read_quiz(self.__filename, self.__offset, self.__encoding)
+        return self.__quiz
+
+    def offset(self) -> int:
+        return self.__offset
+
+    def question(self):
+        return self.__load().question()
+
+    def answers(self):
+        return self.__load().answers()
+
+    def right_answers(self):
+        return self.__load().right_answers()
+
+
+class BoxSource:
+    '''Element a box is built from, for the rules reading more of it later'''
+
+    __slots__ = ("filename", "offset", "encoding", "ordinal", "stamp")
+
+    def __init__(self, filename: str, offset: int, encoding: Optional[str] = None, ordinal: int = 0,
+                 stamp: Optional[Stamp] = None):
+        self.filename = filename
+        self.offset = offset
+        self.encoding = encoding
+        # Elements with the same tag before this one, and the file stamp at load time
+        self.ordinal = ordinal
+        self.stamp = stamp
+
+    def lazy_quiz(self) -> LazyQuiz:
+        return LazyQuiz(self.filename, self.offset, self.encoding, self.ordinal, self.stamp)
+
+
+class Board:
+
+    def __init__(self, types: Optional[BoxTypes] = None):
+        self.__types = types if types is not None else box_types()
+        self.__boxes: List[BoxRule] = []
+        self.__records: List[Record] = []
+        self.__encoding: Optional[str] = None
+        # Attributes of the root element
+        self.__properties: Dict[str, str] = {}
+        self.__bank_filename: Optional[str] = None
+        self.__stamp: Optional[Stamp] = None
+        self.__ordinals: Dict[str, int] = {}
+
+    def load(self, filename: str, cache: bool = True) -> bool:
+        '''Loads the board from its compiled cache, or parses the file and writes the cache'''
+        ret = False
+        count = len(self.__boxes)
+        self.__ordinals = {}
+        try:
+            self.__stamp = file_stamp(filename)
+            digest = file_digest(filename)
+        except OSError as e:
+            logging.warning("Cannot load board %s: %s", filename, e)
+        else:
+            fingerprint = self.__types.fingerprint()
+            cached = read_cache(filename, digest, fingerprint) if cache else None
+            if cached is not None:
+                self.__encoding, properties, records = cached
+                self.__load_properties(properties, filename)
+                for tag, offset, attrs in records:
+                    self.__load_box(tag, attrs, filename, offset)
+                ret = True
+            else:
+                ret = self.__parse(filename)
+                if ret and cache:
+                    write_cache(filename, digest, fingerprint, self.__encoding, self.__properties, self.__records)
+            if ret:
+                try:
+                    self.__check_bank(count)
+                except ValueError as e:
+                    logging.warning("Cannot load board %s: %s", filename, e)
+                    del self.__boxes[count:]
+                    del self.__records[count:]
+                    ret = False
+        return ret
+
+    def __check_bank(self, first: int):
+        '''Checks that the bank has quizzes for every quiz box drawing from it'''
+        # The bank reads its quizzes with the parser of the boards
+        from engine.quizbank import open_bank
+
+        drawn = [box for box in self.__boxes[first:] if isinstance(box, BankQuizRule)]
+        if drawn:
+            if self.__bank_filename is None:
+                raise ValueError("Quiz boxes without a question need a bank attribute on the root element")
+            try:
+                bank = open_bank(self.__bank_filename)
+            except (OSError, ValueError, struct.error) as e:
+                raise ValueError("Cannot open quiz bank {}: {}".format(self.__bank_filename, e))
+            for box in drawn:
+                if len(bank.select(box.category(), box.difficulty())) == 0:
+                    raise ValueError("Box {}: no quiz of category {!r} and difficulty {} in {}".format(
+                        box.idx, box.category(), box.difficulty(), self.__bank_filename))
+
+    def __parse(self, filename: str) -> bool:
+        '''Streams the board file, creating each box as soon as its element starts.
+
+        Quizzes only keep their position in the file and are parsed when a
+        team lands on them.
+        '''
+        ret = False
+        depth = 0
+        count = len(self.__boxes)
+
+        def xml_decl(version: str, encoding: Optional[str], standalone: int):
+            self.__encoding = encoding
+
+        def start_element(name: str, attrs: Dict[str, str]):
+            nonlocal depth
+            depth += 1
+            if depth == 1:
+                self.__load_properties(attrs, filename)
+            elif depth == 2:
+                self.__load_box(name, attrs, filename, parser.CurrentByteIndex)
+
+        def end_element(name: str):
+            nonlocal depth
+            depth -= 1
+
+        parser = expat.ParserCreate()
+        parser.XmlDeclHandler = xml_decl
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        try:
+            with open(filename, "rb") as file:
+                parser.ParseFile(file)
+        except (OSError, expat.ExpatError, ValueError) as e:
+            logging.warning("Cannot load board %s: %s", filename, e)
+            del self.__boxes[count:]
+            del self.__records[count:]
+        else:
+            ret = True
+        return ret
+
+    def __load_properties(self, attrs: Dict[str, str], filename: str):
+        self.__properties = dict(attrs)
+        if "bank" in attrs:
+            self.__bank_filename = os.path.join(os.path.dirname(filename), attrs["bank"])
+
+    def __load_box(self, name: str, attrs: Dict[str, str], filename: str, offset: int):
+        box_type = self.__types.get(name)
+        if box_type is not None:
+            ordinal = self.__ordinals.get(name, 0)
+            self.__ordinals[name] = ordinal + 1
+            self.add_box(box_type.build(attrs, BoxSource(filename, offset, self.__encoding, ordinal, self.__stamp)))
+            # Only what is needed to create the box is cached, the answers are read lazily
+            self.__records.append((name, offset, box_type.kept(attrs)))
+
+    def add_box(self, box: BoxRule):
+        box.idx = len(self.__boxes)
+        self.__boxes.append(box)
+
+    def properties(self) -> Dict[str, str]:
+        return self.__properties
+
+    def bank_filename(self) -> Optional[str]:
+        '''Quiz bank the quiz boxes without a question draw from'''
+        return self.__bank_filename
+
+    def types(self) -> BoxTypes:
+        return self.__types
+
+    def boxes(self) -> List[BoxRule]:
+        return self.__boxes
+
+    def finish_idx(self) -> int:
+        return len(self.__boxes) - 1
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TYPE_CHECKING
+
+from engine.rules import BoxRule, StartRule, FinishRule, QuizRule, BankQuizRule, Challenge, ChallengeRule, \
+    SkipTurnRule, RollTheDiceAgainRule, WarpRule, GoBackRule
+
+if TYPE_CHECKING:
+    from engine.board import BoxSource
+
+# Builds the rule of a box from the parsed attributes of its element
+Factory = Callable[[Dict[str, Any], "BoxSource"], BoxRule]
+
+
+class BoxType:
+    '''Declaration of a kind of box.
+
+    params maps the attributes the rule is built from to their parsers; they
+    are the only attributes kept in the board cache. flags are attributes
+    the rule only needs to know are there, passed as True; their values are
+    not cached. image is the artwork views draw on the box, if any.
+    '''
+
+    __slots__ = ("tag", "factory", "params", "flags", "required", "image")
+
+    def __init__(self, tag: str, factory: Factory, params: Optional[Dict[str, Callable[[str], Any]]] = None,
+                 flags: Sequence[str] = (), required: Sequence[str] = (), image: Optional[str] = None):
+        self.tag = tag
+        self.factory = factory
+        self.params = params if params is not None else {}
+        self.flags = tuple(flags)
+        self.required = tuple(required)
+        self.image = image
+
+    def kept(self, attrs: Dict[str, str]) -> Dict[str, str]:
+        '''Attributes of an element the rule is built from'''
+        ret = {key: attrs[key] for key in self.params if key in attrs}
+        ret.update((key, "") for key in self.flags if key in attrs)
+        return ret
+
+    def build(self, attrs: Dict[str, str], source: BoxSource) -> BoxRule:
+        for key in self.required:
+            if key not in attrs:
+                raise ValueError("<{}> box without the {} attribute".format(self.tag, key))
+        try:
+            params = {key: parse(attrs[key]) for key, parse in self.params.items() if key in attrs}
+        except ValueError as e:
+            raise ValueError("Invalid <{}> box: {}".format(self.tag, e))
+        params.update((key, True) for key in self.flags if key in attrs)
+        ret = self.factory(params, source)
+        ret.tag = self.tag
+        return ret
+
+
+def rule_factory(rule_class: Callable[..., BoxRule]) -> Factory:
+    '''Factory passing the parameters of the box to the constructor of the rule'''
+    return lambda params, source: rule_class(**params)
+
+
+def _quiz(params: Dict[str, Any], source: BoxSource) -> BoxRule:
+    # Inline quizzes are read from the board file when a team lands on them
+    if params.get("question"):
+        return QuizRule(source.lazy_quiz())
+    return BankQuizRule(params.get("category"), params.get("difficulty"))
+
+
+def _challenge(params: Dict[str, Any], source: BoxSource) -> BoxRule:
+    return ChallengeRule(Challenge(params.get("text", "")))
+
+
+BOX_TYPES = [
+    BoxType("start", rule_factory(StartRule), image=":images/boxes/start.png"),
+    BoxType("quiz", _quiz, {"category": str, "difficulty": int}, flags=["question"],
+            image=":images/boxes/question_mark.png"),
+    BoxType("challenge", _challenge, {"text": str}, image=":images/boxes/medal.png"),
+    BoxType("rollthediceagain", rule_factory(RollTheDiceAgainRule), image=":images/boxes/dice.png"),
+    BoxType("skiptheturn", rule_factory(SkipTurnRule), image=":images/boxes/rest.png"),
+    BoxType("warp", rule_factory(WarpRule), {"to": int}, required=["to"]),
+    BoxType("goback", rule_factory(GoBackRule), {"steps": int}, required=["steps"]),
+    BoxType("finish", rule_factory(FinishRule), image=":images/boxes/finish.jpg"),
+]
+
+
+class BoxTypes:
+    '''Dispatch table from the element names of a board file to box types'''
+
+    def __init__(self, types: Iterable[BoxType] = ()):
+        self.__types: Dict[str, BoxType] = {}
+        for box_type in types:
+            self.register(box_type)
+
+    def register(self, box_type: BoxType):
+        '''Adds a kind of box, or replaces the one with the same tag'''
+        self.__types[box_type.tag] = box_type
+
+    def get(self, tag: str) -> Optional[BoxType]:
+        return self.__types.get(tag)
+
+    def tags(self) -> List[str]:
+        return list(self.__types)
+
+    def fingerprint(self) -> bytes:
+        '''Digest of what the board cache depends on, it changes with the types registered'''
+        digest = hashlib.sha256()
+        for tag in sorted(self.__types):
+            box_type = self.__types[tag]
+            digest.update(repr((tag, sorted(box_type.params), box_type.flags, box_type.required)).encode("utf-8"))
+        return digest.digest()
+
+
+_box_types = BoxTypes(BOX_TYPES)
+
+
+def box_types() -> BoxTypes:
+    '''Box types boards are loaded with by default'''
+    return _box_types
+
+
+def register_box_type(box_type: BoxType):
+    _box_types.register(box_type)
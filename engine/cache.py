@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+from logging import getLogger
+
+logging = getLogger(__name__)
+
+MAGIC = b"GOOSEBRD"
+FORMAT_VERSION = 5
+
+_HEADER = struct.Struct("<8sH32s32sI")
+_RECORD = struct.Struct("<BQB")
+_LENGTH = struct.Struct("<I")
+
+# (tag, byte offset of the element in the source file, attributes declared by the box type)
+Record = Tuple[str, int, Dict[str, str]]
+
+
+def cache_filename(filename: str) -> str:
+    return filename + ".cache"
+
+
+def file_digest(filename: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(filename, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def write_cache(filename: str, digest: bytes, fingerprint: bytes, encoding: Optional[str], properties: Dict[str, str],
+                records: List[Record]):
+    tags = sorted(set(tag for tag, _, _ in records))
+    tag_idx = {tag: i for i, tag in enumerate(tags)}
+
+    def pack_string(s: str) -> bytes:
+        b = s.encode("utf-8")
+        return _LENGTH.pack(len(b)) + b
+
+    path = cache_filename(filename)
+    try:
+        data = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, digest, fingerprint, len(records)))
+        data += pack_string(encoding or "") + pack_string(str(len(properties)))
+        for key, value in properties.items():
+            data += pack_string(key) + pack_string(value)
+        data += pack_string(str(len(tags)))
+        for tag in tags:
+            data += pack_string(tag)
+        for tag, offset, attrs in records:
+            data += _RECORD.pack(tag_idx[tag], offset, len(attrs))
+            for key, value in attrs.items():
+                data += pack_string(key) + pack_string(value)
+    except (struct.error, UnicodeError) as e:
+        # The board is loaded anyway, it is parsed again next time
+        logging.warning("Cannot write board cache %s: %s", path, e)
+        return
+
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning("Cannot write board cache %s: %s", path, e)
+
+
+def read_cache(filename: str, digest: bytes,
+               fingerprint: bytes) -> Optional[Tuple[Optional[str], Dict[str, str], List[Record]]]:
+    '''Returns the encoding, the board properties and the box records, or None if the cache is missing or stale.
+
+    The cache is stale when the file changed or when it was written with other box types.
+    '''
+    try:
+        with open(cache_filename(filename), "rb") as file:
+            data = memoryview(file.read())
+    except OSError:
+        return None
+
+    try:
+        magic, version, cached_digest, cached_fingerprint, count = _HEADER.unpack_from(data, 0)
+        if (magic != MAGIC) or (version != FORMAT_VERSION) or (cached_digest != digest) or \
+                (cached_fingerprint != fingerprint):
+            return None
+        pos = _HEADER.size
+
+        def read_string() -> str:
+            nonlocal pos
+            length, = _LENGTH.unpack_from(data, pos)
+            pos += _LENGTH.size
+            s = str(data[pos:pos + length], "utf-8")
+            pos += length
+            return s
+
+        encoding = read_string() or None
+        properties = {read_string(): read_string() for _ in range(int(read_string()))}
+        tags = [read_string() for _ in range(int(read_string()))]
+        records = []
+        for _ in range(count):
+            idx, offset, length = _RECORD.unpack_from(data, pos)
+            pos += _RECORD.size
+            records.append((tags[idx], offset, {read_string(): read_string() for _ in range(length)}))
+    except (struct.error, ValueError, IndexError) as e:
+        logging.warning("Ignoring corrupted board cache for %s: %s", filename, e)
+        return None
+    return encoding, properties, records
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import os
+import struct
+from concurrent.futures import Executor, Future, wait
+from typing import Any, BinaryIO, List, Optional, Tuple
+from logging import getLogger
+
+from engine.match import Listener, Match, TeamState
+from engine.rules import Request
+
+logging = getLogger(__name__)
+
+MAGIC = b"GOOSELOG"
+FORMAT_VERSION = 2
+
+TEAM = 0
+ROLL = 1
+QUIZ = 2
+CHALLENGE = 3
+TURN_END = 4
+
+_HEADER = struct.Struct("<8sH")
+_RECORD = struct.Struct("<BB")
+_LENGTH = struct.Struct("<H")
+_COLOR = struct.Struct("<I")
+
+_KINDS = {Request.Kind.ROLL: ROLL, Request.Kind.QUIZ: QUIZ, Request.Kind.CHALLENGE: CHALLENGE}
+_REQUESTS = {code: kind for kind, code in _KINDS.items()}
+
+Event = Tuple[Request.Kind, Any]
+
+
+class LogContents:
+
+    def __init__(self, teams: List[str], colors: List[int], icons: List[Optional[str]],
+                 turns: List[List[Event]], length: int):
+        self.teams = teams
+        # RGBA color and icon file of each team
+        self.colors = colors
+        self.icons = icons
+        self.turns = turns
+        # Bytes up to the end of the last complete turn
+        self.length = length
+
+
+def _pack_string(s: str) -> bytes:
+    b = s.encode("utf-8")
+    return _LENGTH.pack(len(b)) + b
+
+
+def _read_string(data: memoryview, pos: int) -> Tuple[str, int]:
+    length, = _LENGTH.unpack_from(data, pos)
+    pos += _LENGTH.size
+    if pos + length > len(data):
+        raise ValueError("Truncated string")
+    return str(data[pos:pos + length], "utf-8"), pos + length
+
+
+def read_log(filename: str) -> LogContents:
+    '''Reads a log, ignoring the inputs of a turn that was not completed'''
+    with open(filename, "rb") as file:
+        data = memoryview(file.read())
+
+    magic, version = _HEADER.unpack_from(data, 0) if len(data) >= _HEADER.size else (None, None)
+    if (magic != MAGIC) or (version != FORMAT_VERSION):
+        raise ValueError("{} is not a game log".format(filename))
+
+    teams = []
+    colors = []
+    icons = []
+    turns = []
+    turn: List[Event] = []
+    pos = _HEADER.size
+    length = pos
+    while pos + _RECORD.size <= len(data):
+        code, value = _RECORD.unpack_from(data, pos)
+        pos += _RECORD.size
+        if code == TEAM:
+            try:
+                name, pos = _read_string(data, pos)
+                color, = _COLOR.unpack_from(data, pos)
+                icon, pos = _read_string(data, pos + _COLOR.size)
+            except (struct.error, ValueError):
+                break
+            teams.append(name)
+            colors.append(color)
+            icons.append(icon or None)
+            length = pos
+        elif code == TURN_END:
+            turns.append(turn)
+            turn = []
+            length = pos
+        elif code in _REQUESTS:
+            kind = _REQUESTS[code]
+            turn.append((kind, value if kind == Request.Kind.ROLL else bool(value)))
+        else:
+            break
+    return LogContents(teams, colors, icons, turns, length)
+
+
+def replay(match: Match, turns: List[List[Event]]) -> int:
+    '''Plays the logged turns again without notifying the match listeners'''
+    with match.listener().muted():
+        for i, events in enumerate(turns):
+            steps = match.steps()
+            values = iter(events)
+            try:
+                request = next(steps)
+                while True:
+                    event = next(values, None)
+                    if (event is None) or (event[0] != request.kind):
+                        raise ValueError("Turn {} of the log does not match the game".format(i))
+                    request = steps.send(event[1])
+            except StopIteration:
+                pass
+    return len(turns)
+
+
+class EventLog(Listener):
+    '''Appends every input of a match to a binary log, synced to disk at the end of each turn.
+
+    With an executor, the syncs run on it so that a slow disk does not hold
+    up the thread playing the match.
+    '''
+
+    def __init__(self, filename: str, executor: Optional[Executor] = None):
+        self.__filename = filename
+        self.__file: Optional[BinaryIO] = None
+        self.__executor = executor
+        self.__syncs: List[Future] = []
+
+    def filename(self) -> str:
+        return self.__filename
+
+    def start(self, teams: List[TeamState], colors: Optional[List[int]] = None,
+              icons: Optional[List[Optional[str]]] = None):
+        '''Starts a new log, replacing any previous one.
+
+        colors are the RGBA colors of the teams and icons their image files,
+        kept so that a recovered match looks the same.
+        '''
+        if colors is None:
+            colors = [0xFFFFFFFF] * len(teams)
+        if icons is None:
+            icons = [None] * len(teams)
+        self.close()
+        self.__file = open(self.__filename, "wb")
+        self.__file.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+        for team, color, icon in zip(teams, colors, icons):
+            self.__file.write(_RECORD.pack(TEAM, 0) + _pack_string(team.name()) + _COLOR.pack(color) +
+                              _pack_string(icon or ""))
+        self.__sync_soon()
+
+    def recover(self, match: Match, contents: Optional[LogContents] = None):
+        '''Replays the log on the match and keeps appending to it.
+
+        The match must have the teams listed in the log; the inputs of an
+        unfinished turn are dropped.
+        '''
+        if contents is None:
+            contents = read_log(self.__filename)
+        replay(match, contents.turns)
+        self.close()
+        self.__file = open(self.__filename, "r+b")
+        self.__file.truncate(contents.length)
+        self.__file.seek(contents.length)
+        logging.info("Recovered %d turns from %s", len(contents.turns), self.__filename)
+
+    def close(self):
+        if self.__file is not None:
+            # The file descriptor must outlive the syncs still running
+            wait(self.__syncs)
+            self.__syncs = []
+            self.__sync()
+            self.__file.close()
+            self.__file = None
+
+    def received(self, request: Request, value: Any):
+        if self.__file is not None:
+            self.__file.write(_RECORD.pack(_KINDS[request.kind], int(value)))
+
+    def turn_finished(self, team: TeamState):
+        if self.__file is not None:
+            self.__file.write(_RECORD.pack(TURN_END, 0))
+            self.__sync_soon()
+
+    def __sync_soon(self):
+        if self.__executor is not None:
+            self.__file.flush()
+            self.__syncs = [sync for sync in self.__syncs if not sync.done()]
+            sync = self.__executor.submit(os.fsync, self.__file.fileno())
+            sync.add_done_callback(self.__synced)
+            self.__syncs.append(sync)
+        else:
+            self.__sync()
+
+    def __synced(self, sync: Future):
+        if sync.exception() is not None:
+            logging.warning("Cannot sync %s: %s", self.__filename, sync.exception())
+
+    def __sync(self):
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import breadth_first_order
+from scipy.sparse.linalg import splu
+
+from engine.board import Board
+from engine.rules import QUIZ, CHALLENGE, SKIP_THE_TURN, ROLL_THE_DICE_AGAIN, MOVE
+from engine.simulator import landing_kinds, destinations
+
+
+class Landing:
+    '''Outcome of landing on a box, with the rollthediceagain chain already resolved'''
+
+    def __init__(self):
+        self.states: Dict[int, float] = {}
+        self.came_back = 0.0
+        self.finished = 0.0
+        self.landings: Dict[int, float] = {}
+
+    def add(self, other: Landing, weight: float):
+        for state, p in other.states.items():
+            self.states[state] = self.states.get(state, 0.0) + p * weight
+        for idx, n in other.landings.items():
+            self.landings[idx] = self.landings.get(idx, 0.0) + n * weight
+        self.came_back += other.came_back * weight
+        self.finished += other.finished * weight
+
+
+class MarkovChain:
+    '''Exact turn statistics of a single team as an absorbing Markov chain.
+
+    A state is a box index plus, for skiptheturn boxes, the skip flag; the
+    finish box is the only absorbing state. The number of turns counts the
+    turns of one team, so it equals the number of rounds of a match.
+    '''
+
+    def __init__(self, board: Board, quiz_probability: float = 0.5, challenge_probability: float = 0.5,
+                 faces: int = 6):
+        self.__kinds = landing_kinds(board)
+        self.__destinations = destinations(board)
+        self.__finish_idx = len(self.__kinds) - 1
+        self.__quiz_probability = quiz_probability
+        self.__challenge_probability = challenge_probability
+        self.__faces = faces
+
+        # States [0, finish) are the boxes, then one skipping state per skiptheturn box
+        skip_boxes = np.flatnonzero(self.__kinds[:self.__finish_idx] == SKIP_THE_TURN)
+        self.__skip_states = {int(idx): self.__finish_idx + i for i, idx in enumerate(skip_boxes)}
+        self.__size = self.__finish_idx + len(skip_boxes)
+
+        self.__q, self.__exit, self.__l = self.__build()
+        trapped = self.__trapped()
+        if trapped:
+            raise ValueError("Teams on boxes {} never reach the finish, are some quizzes or challenges never "
+                             "passed?".format(", ".join(str(idx) for idx in trapped[:10])))
+        try:
+            self.__lu = splu(sparse.identity(self.__size, format="csc") - self.__q.tocsc())
+        except RuntimeError as e:
+            raise ValueError("Cannot solve the chain of the board: {}".format(e))
+
+        ones = np.ones(self.__size)
+        self.__t = self.__lu.solve(ones)
+        self.__s = self.__lu.solve(2 * self.__t - ones)
+        start = np.zeros(self.__size)
+        start[0] = 1.0
+        self.__visits = self.__lu.solve(start, trans="T")
+
+    def size(self) -> int:
+        return self.__size
+
+    def transition_matrix(self) -> sparse.csr_matrix:
+        '''Transitions between the non absorbing states'''
+        return self.__q
+
+    def expected_turns(self) -> float:
+        return float(self.__t[0])
+
+    def variance(self) -> float:
+        return float(self.__s[0] - self.__t[0] ** 2)
+
+    def landings(self) -> np.ndarray:
+        '''Expected number of times the team lands on each box during a game'''
+        return self.__l.T @ self.__visits
+
+    def landing_probabilities(self) -> np.ndarray:
+        '''Probability that a landing of the team is on each box'''
+        landings = self.landings()
+        return landings / landings.sum()
+
+    def turns_distribution(self, tolerance: float = 1e-12, max_turns: int = 100000) -> np.ndarray:
+        '''Probability of finishing at each turn, index 0 is always 0'''
+        p = [0.0]
+        x = np.zeros(self.__size)
+        x[0] = 1.0
+        q_t = self.__q.T.tocsr()
+        while (x.sum() > tolerance) and (len(p) <= max_turns):
+            p.append(float(x @ self.__exit))
+            x = q_t @ x
+        return np.array(p)
+
+    def win_rates(self, teams: int, tolerance: float = 1e-12) -> np.ndarray:
+        '''Winning probability of each team, in playing order, if all teams have these odds'''
+        p = self.turns_distribution(tolerance)
+        survival = 1.0 - np.cumsum(p)
+        survival_before = np.concatenate(([1.0], survival[:-1]))
+        k = np.arange(teams)[:, np.newaxis]
+        return (p * survival ** k * survival_before ** (teams - 1 - k)).sum(axis=1)
+
+    def __build(self) -> Tuple[sparse.csr_matrix, np.ndarray, sparse.csr_matrix]:
+        rows: List[int] = []
+        cols: List[int] = []
+        values: List[float] = []
+        l_rows: List[int] = []
+        l_cols: List[int] = []
+        l_values: List[float] = []
+        exit_p = np.zeros(self.__size)
+        landings = self.__landings()
+
+        for idx in range(self.__finish_idx):
+            landing = Landing()
+            for val in range(1, self.__faces + 1):
+                landing.add(landings[min(idx + val, self.__finish_idx)], 1 / self.__faces)
+            states = dict(landing.states)
+            states[idx] = states.get(idx, 0.0) + landing.came_back
+            for state, p in states.items():
+                rows.append(idx)
+                cols.append(state)
+                values.append(p)
+            for box_idx, n in landing.landings.items():
+                l_rows.append(idx)
+                l_cols.append(box_idx)
+                l_values.append(n)
+            exit_p[idx] = landing.finished
+
+        # A team resting on a skiptheturn box loses the turn and then plays normally
+        for idx, state in self.__skip_states.items():
+            rows.append(state)
+            cols.append(idx)
+            values.append(1.0)
+
+        shape = (self.__size, self.__size)
+        q = sparse.csr_matrix((values, (rows, cols)), shape=shape)
+        l_matrix = sparse.csr_matrix((l_values, (l_rows, l_cols)), shape=(self.__size, self.__finish_idx + 1))
+        return q, exit_p, l_matrix
+
+    def __trapped(self) -> List[int]:
+        '''Boxes whose states cannot lead to the finish, they make the chain singular'''
+        # Transitions reversed, with the finish as an extra node the exits lead to
+        sources, targets = (self.__q > 0).nonzero()
+        exits = np.flatnonzero(self.__exit > 0)
+        finish = self.__size
+        graph = sparse.csr_matrix((np.ones(len(sources) + len(exits)),
+                                   (np.concatenate((targets, np.full(len(exits), finish))),
+                                    np.concatenate((sources, exits)))),
+                                  shape=(self.__size + 1, self.__size + 1))
+        reached = np.zeros(self.__size + 1, dtype=bool)
+        reached[breadth_first_order(graph, finish, return_predecessors=False)] = True
+        skip_boxes = {state: idx for idx, state in self.__skip_states.items()}
+        return sorted(set(skip_boxes.get(int(state), int(state)) for state in np.flatnonzero(~reached[:finish])))
+
+    def __landings(self) -> List[Landing]:
+        '''Outcome of landing on each box.
+
+        A rollthediceagain box only leads further on, so the boxes are
+        resolved backwards from the finish and every chain is already known.
+        '''
+        ret: List[Landing] = [Landing() for _ in range(self.__finish_idx + 1)]
+        for idx in range(self.__finish_idx, -1, -1):
+            landing = ret[idx]
+            landing.landings[idx] = 1.0
+            kind = self.__kinds[idx]
+            if idx == self.__finish_idx:
+                landing.finished = 1.0
+            elif kind == QUIZ:
+                landing.states[idx] = self.__quiz_probability
+                landing.came_back = 1.0 - self.__quiz_probability
+            elif kind == CHALLENGE:
+                landing.states[idx] = self.__challenge_probability
+                landing.came_back = 1.0 - self.__challenge_probability
+            elif kind == SKIP_THE_TURN:
+                landing.states[self.__skip_states[idx]] = 1.0
+            elif kind == MOVE:
+                destination = int(self.__destinations[idx])
+                if destination == self.__finish_idx:
+                    landing.finished = 1.0
+                else:
+                    landing.states[destination] = 1.0
+            elif kind == ROLL_THE_DICE_AGAIN:
+                for val in range(1, self.__faces + 1):
+                    landing.add(ret[min(idx + val, self.__finish_idx)], 1 / self.__faces)
+            else:
+                landing.states[idx] = 1.0
+        return ret
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import random
+import struct
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import List, Optional, Any
+
+from engine.board import Board
+from engine.quizbank import QuizSampler, open_bank
+from engine.rules import Quiz, QuizNotFound, Challenge, Result, Request, Step
+
+
+class TeamState:
+    '''Position and flags of a team on the board'''
+
+    __slots__ = ("__name", "idx", "skip_turn")
+
+    def __init__(self, name: str = "New team"):
+        self.__name = name
+
+        self.idx = 0
+        self.skip_turn = False
+
+    def set_name(self, name: str):
+        self.__name = name
+
+    def name(self):
+        return self.__name
+
+
+class Dice(ABC):
+
+    @abstractmethod
+    def roll(self, team: TeamState) -> int:
+        pass
+
+
+class RandomDice(Dice):
+
+    def __init__(self, seed: Optional[int] = None, faces: int = 6):
+        self.__random = random.Random(seed)
+        self.__faces = faces
+
+    def roll(self, team: TeamState) -> int:
+        return self.__random.randint(1, self.__faces)
+
+
+class AnswerProvider(ABC):
+
+    @abstractmethod
+    def quiz_result(self, team: TeamState, quiz: Quiz) -> bool:
+        pass
+
+    @abstractmethod
+    def challenge_result(self, team: TeamState, challenge: Challenge) -> bool:
+        pass
+
+
+class RandomAnswerProvider(AnswerProvider):
+    '''Answers quizzes and challenges right with a fixed probability'''
+
+    def __init__(self, quiz_probability: float = 0.5, challenge_probability: float = 0.5,
+                 seed: Optional[int] = None):
+        self.__random = random.Random(seed)
+        self.__quiz_probability = quiz_probability
+        self.__challenge_probability = challenge_probability
+
+    def quiz_result(self, team: TeamState, quiz: Quiz) -> bool:
+        return self.__random.random() < self.__quiz_probability
+
+    def challenge_result(self, team: TeamState, challenge: Challenge) -> bool:
+        return self.__random.random() < self.__challenge_probability
+
+
+class Listener:
+    '''Receives what happens during a turn, e.g. to update a view'''
+
+    def team_moved(self, team: TeamState, idx: int):
+        pass
+
+    def turn_skipped(self, team: TeamState):
+        pass
+
+    def answered(self, team: TeamState, result: bool):
+        pass
+
+    def winner(self, team: TeamState):
+        pass
+
+    def requested(self, request: Request):
+        pass
+
+    def received(self, request: Request, value: Any):
+        pass
+
+    def turn_finished(self, team: TeamState):
+        pass
+
+
+class Listeners(Listener):
+    '''Forwards every event to a list of listeners'''
+
+    def __init__(self):
+        self.__listeners: List[Listener] = []
+        self.__muted = 0
+
+    def add(self, listener: Listener):
+        self.__listeners.append(listener)
+
+    def remove(self, listener: Listener):
+        self.__listeners.remove(listener)
+
+    @contextmanager
+    def muted(self):
+        '''Drops the events while in the context, e.g. while replaying a match'''
+        self.__muted += 1
+        try:
+            yield
+        finally:
+            self.__muted -= 1
+
+    def team_moved(self, team: TeamState, idx: int):
+        if not self.__muted:
+            for listener in self.__listeners:
+                listener.team_moved(team, idx)
+
+    def turn_skipped(self, team: TeamState):
+        if not self.__muted:
+            for listener in self.__listeners:
+                listener.turn_skipped(team)
+
+    def answered(self, team: TeamState, result: bool):
+        if not self.__muted:
+            for listener in self.__listeners:
+                listener.answered(team, result)
+
+    def winner(self, team: TeamState):
+        if not self.__muted:
+            for listener in self.__listeners:
+                listener.winner(team)
+
+    def requested(self, request: Request):
+        if not self.__muted:
+            for listener in self.__listeners:
+                listener.requested(request)
+
+    def received(self, request: Request, value: Any):
+        if not self.__muted:
+            for listener in self.__listeners:
+                listener.received(request, value)
+
+    def turn_finished(self, team: TeamState):
+        if not self.__muted:
+            for listener in self.__listeners:
+                listener.turn_finished(team)
+
+
+class Match:
+    '''Turn loop of a game, runs without any display'''
+
+    def __init__(self,
+                 board: Board,
+                 dice: Optional[Dice] = None,
+                 answers: Optional[AnswerProvider] = None,
+                 listener: Optional[Listener] = None,
+                 quizzes: Optional[QuizSampler] = None):
+        self.__board = board
+        self.__dice = dice
+        self.__answers = answers
+        self.__quizzes = quizzes
+        self.__listeners = Listeners()
+        if listener is not None:
+            self.__listeners.add(listener)
+
+        self.__teams: List[TeamState] = []
+        self.__team_idx = 0
+        self.__turn = 0
+        self.__winner: Optional[TeamState] = None
+
+    def board(self) -> Board:
+        return self.__board
+
+    def answers(self) -> AnswerProvider:
+        return self.__answers
+
+    def quizzes(self) -> QuizSampler:
+        '''Draws the questions of the match from the quiz bank of the board'''
+        if self.__quizzes is None:
+            filename = self.__board.bank_filename()
+            if filename is None:
+                raise QuizNotFound("The board has no quiz bank")
+            try:
+                self.__quizzes = QuizSampler(open_bank(filename))
+            except (OSError, ValueError, struct.error) as e:
+                raise QuizNotFound("Cannot open quiz bank {}: {}".format(filename, e))
+        return self.__quizzes
+
+    def listener(self) -> Listeners:
+        return self.__listeners
+
+    def add_listener(self, listener: Listener):
+        self.__listeners.add(listener)
+
+    def add_team(self, team: TeamState):
+        self.__teams.append(team)
+
+    def teams(self) -> List[TeamState]:
+        return self.__teams
+
+    def current_team(self) -> TeamState:
+        return self.__teams[self.__team_idx]
+
+    def turn(self) -> int:
+        return self.__turn
+
+    def winner(self) -> Optional[TeamState]:
+        return self.__winner
+
+    def steps(self) -> Step:
+        '''Plays the turn of the current team, yielding a Request whenever an input is needed.
+
+        The answer to each request has to be sent back into the generator.
+        '''
+        boxes = self.__board.boxes()
+        team = self.current_team()
+        box = boxes[team.idx]
+        old_idx = team.idx
+
+        run = True
+        while run:
+            ret = yield from box.pre_execute(self)
+            if ret:
+                box = boxes[team.idx]
+                result = yield from box.post_execute(self)
+                if result == Result.FINISH_THE_TURN:
+                    run = False
+                elif result == Result.CAME_BACK:
+                    self.__set_idx(team, old_idx)
+                    run = False
+                elif result == Result.GO_ON:
+                    run = True
+            else:
+                run = False
+
+        self.__listeners.turn_finished(team)
+        self.__next_team()
+
+    def request(self, request: Request) -> Step:
+        '''Waits for the answer to a request'''
+        self.__listeners.requested(request)
+        value = yield request
+        self.__listeners.received(request, value)
+        return value
+
+    def next(self):
+        '''Plays the turn of the current team, answering the requests with the dice and answer providers'''
+        steps = self.steps()
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(self.answer(request))
+        except StopIteration:
+            pass
+
+    def answer(self, request: Request) -> Any:
+        if request.kind == Request.Kind.ROLL:
+            ret = self.__dice.roll(request.team)
+        elif request.kind == Request.Kind.QUIZ:
+            ret = self.__answers.quiz_result(request.team, request.subject)
+        else:
+            ret = self.__answers.challenge_result(request.team, request.subject)
+        return ret
+
+    def play(self, max_turns: int = 100000) -> Optional[TeamState]:
+        while (self.__winner is None) and (self.__turn < max_turns):
+            self.next()
+        return self.__winner
+
+    def move_team(self, team: TeamState, val: int):
+        finish_idx = self.__board.finish_idx()
+        idx = team.idx + val
+        if idx < finish_idx:
+            self.__set_idx(team, idx)
+        else:
+            self.__set_idx(team, finish_idx)
+            if self.__winner is None:
+                self.__winner = team
+            self.__listeners.winner(team)
+
+    def roll_the_dice(self) -> Step:
+        team = self.current_team()
+        if team.idx < self.__board.finish_idx():
+            val = yield from self.request(Request(Request.Kind.ROLL, team))
+            self.move_team(team, val)
+
+    def __set_idx(self, team: TeamState, idx: int):
+        team.idx = idx
+        self.__listeners.team_moved(team, idx)
+
+    def __next_team(self):
+        self.__turn += 1
+        self.__team_idx += 1
+        if self.__team_idx >= len(self.__teams):
+            self.__team_idx = 0
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from logging import getLogger
+from xml.parsers import expat
+
+import numpy as np
+
+from engine.board import parse_answer
+from engine.rules import Quiz, QuizNotFound
+
+logging = getLogger(__name__)
+
+MAGIC = b"GOOSEQZB"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sHIIQ")
+_LENGTH = struct.Struct("<H")
+_ANSWERS = struct.Struct("<BI")
+
+# Limits of the fields of a bank
+MAX_TEXT = 0xFFFF
+MAX_ANSWERS = 32
+MAX_CATEGORIES = 0x10000
+MAX_DIFFICULTY = 0xFF
+
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u4"), ("category", "<u2"), ("difficulty", "u1"),
+                        ("reserved", "u1")])
+
+ANY = None
+
+
+class BankQuiz(Quiz):
+    '''Quiz decoded from a bank, remembering its position in the bank'''
+
+    __slots__ = ("__idx",)
+
+    def __init__(self, idx: int, question: str, answers: List[str], right_answers: List[bool]):
+        Quiz.__init__(self, question, answers, right_answers)
+        self.__idx = idx
+
+    def idx(self) -> int:
+        return self.__idx
+
+
+def build_bank(source: str, filename: str) -> int:
+    '''Compiles the quiz elements of an XML file into a bank, returns the number of quizzes.
+
+    The category and difficulty attributes of each quiz are optional; board
+    files can be used as source too. Raises ValueError, with the line, for
+    quizzes that do not fit in a bank.
+    '''
+    categories: Dict[str, int] = {}
+    index = []
+    data = bytearray()
+    quiz: Optional[Tuple[str, int, int]] = None
+    answers: List[str] = []
+    right = 0
+
+    def check(valid: bool, message: str, *args):
+        if not valid:
+            raise ValueError("Line {} of {}: {}".format(parser.CurrentLineNumber, source, message.format(*args)))
+
+    def check_text(text: str, what: str):
+        length = len(text.encode("utf-8"))
+        check(length <= MAX_TEXT, "{} of {} bytes, at most {} are allowed", what, length, MAX_TEXT)
+
+    def start_element(name: str, attrs: Dict[str, str]):
+        nonlocal quiz, right
+        if name == "quiz" and "question" in attrs:
+            check_text(attrs["question"], "question")
+            category_name = attrs.get("category", "")
+            check_text(category_name, "category")
+            check((category_name in categories) or (len(categories) < MAX_CATEGORIES),
+                  "more than {} categories", MAX_CATEGORIES)
+            try:
+                difficulty = int(attrs.get("difficulty", 0))
+            except ValueError:
+                difficulty = -1
+            check(0 <= difficulty <= MAX_DIFFICULTY, "difficulty {} is not an integer from 0 to {}",
+                  attrs.get("difficulty"), MAX_DIFFICULTY)
+            category = categories.setdefault(category_name, len(categories))
+            quiz = (attrs["question"], category, difficulty)
+            answers.clear()
+            right = 0
+        elif name == "answer" and quiz is not None:
+            check(len(answers) < MAX_ANSWERS, "more than {} answers", MAX_ANSWERS)
+            answer, is_right = parse_answer(attrs.get("text", ""))
+            check_text(answer, "answer")
+            if is_right:
+                right |= 1 << len(answers)
+            answers.append(answer)
+
+    def end_element(name: str):
+        nonlocal quiz
+        if name == "quiz" and quiz is not None:
+            question, category, difficulty = quiz
+            offset = len(data)
+            for text in [question] + answers:
+                b = text.encode("utf-8")
+                data.extend(_LENGTH.pack(len(b)) + b)
+            data.extend(_ANSWERS.pack(len(answers), right))
+            index.append((offset, len(data) - offset, category, difficulty, 0))
+            quiz = None
+
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    try:
+        with open(source, "rb") as file:
+            parser.ParseFile(file)
+    except expat.ExpatError as e:
+        raise ValueError("Cannot parse {}: {}".format(source, e))
+
+    names = bytearray()
+    for category in categories:
+        b = category.encode("utf-8")
+        names += _LENGTH.pack(len(b)) + b
+    data_offset = _HEADER.size + len(names)
+    index_offset = data_offset + len(data)
+    # Keeps the index aligned for the memory map
+    padding = -index_offset % INDEX_DTYPE.alignment
+    index_offset += padding
+    entries = np.array(index, dtype=INDEX_DTYPE)
+    entries["offset"] += data_offset
+
+    tmp_path = "{}.{}.tmp".format(filename, os.getpid())
+    with open(tmp_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(index), len(categories), index_offset))
+        file.write(names)
+        file.write(data)
+        file.write(b"\0" * padding)
+        file.write(entries.tobytes())
+    os.replace(tmp_path, filename)
+    return len(index)
+
+
+class QuizBank:
+    '''Memory mapped quiz bank: only the index is read when opening it, questions are decoded when drawn'''
+
+    def __init__(self, filename: str):
+        self.__filename = filename
+        with open(filename, "rb") as file:
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, category_count, index_offset = _HEADER.unpack_from(self.__map, 0)
+        if (magic != MAGIC) or (version != FORMAT_VERSION):
+            raise ValueError("{} is not a quiz bank".format(filename))
+
+        self.__categories: List[str] = []
+        pos = _HEADER.size
+        for _ in range(category_count):
+            length, = _LENGTH.unpack_from(self.__map, pos)
+            pos += _LENGTH.size
+            self.__categories.append(self.__map[pos:pos + length].decode("utf-8"))
+            pos += length
+        self.__index = np.frombuffer(self.__map, dtype=INDEX_DTYPE, count=count, offset=index_offset)
+
+    def filename(self) -> str:
+        return self.__filename
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    def categories(self) -> List[str]:
+        return self.__categories
+
+    def index(self) -> np.ndarray:
+        return self.__index
+
+    def select(self, category: Optional[str] = ANY, difficulty: Optional[int] = ANY) -> np.ndarray:
+        '''Positions of the quizzes of a category and difficulty'''
+        mask = np.ones(len(self.__index), dtype=bool)
+        if category is not ANY:
+            if category not in self.__categories:
+                return np.empty(0, dtype=np.intp)
+            mask &= self.__index["category"] == self.__categories.index(category)
+        if difficulty is not ANY:
+            mask &= self.__index["difficulty"] == difficulty
+        return np.flatnonzero(mask)
+
+    def quiz(self, idx: int) -> BankQuiz:
+        entry = self.__index[idx]
+        record = memoryview(self.__map)[int(entry["offset"]):int(entry["offset"]) + int(entry["length"])]
+        texts = []
+        pos = 0
+        while pos < len(record) - _ANSWERS.size:
+            length, = _LENGTH.unpack_from(record, pos)
+            pos += _LENGTH.size
+            texts.append(str(record[pos:pos + length], "utf-8"))
+            pos += length
+        count, right = _ANSWERS.unpack_from(record, pos)
+        record.release()
+        return BankQuiz(idx, texts[0], texts[1:], [bool(right & (1 << i)) for i in range(count)])
+
+
+@lru_cache(maxsize=None)
+def open_bank(filename: str) -> QuizBank:
+    '''Opens a bank once, the matches on the same board share its memory map'''
+    return QuizBank(filename)
+
+
+class QuizSampler:
+    '''Draws quizzes from a bank, never twice in the same session until all the matching ones were drawn'''
+
+    def __init__(self, bank: QuizBank, seed: Optional[int] = None):
+        self.__bank = bank
+        self.__random = np.random.default_rng(seed)
+        self.__used = np.zeros(len(bank), dtype=bool)
+        # Shuffled candidates and the position of the next one, for each category and difficulty
+        self.__pools: Dict[Tuple[Optional[str], Optional[int]], List] = {}
+
+    def bank(self) -> QuizBank:
+        return self.__bank
+
+    def draw(self, category: Optional[str] = ANY, difficulty: Optional[int] = ANY) -> BankQuiz:
+        key = (category, difficulty)
+        pool = self.__pools.get(key)
+        while True:
+            if (pool is None) or (pool[1] == len(pool[0])):
+                pool = self.__shuffle(category, difficulty)
+                self.__pools[key] = pool
+            idx = pool[0][pool[1]]
+            pool[1] += 1
+            # Other categories and difficulties may have drawn it meanwhile
+            if not self.__used[idx]:
+                self.__used[idx] = True
+                return self.__bank.quiz(int(idx))
+
+    def __shuffle(self, category: Optional[str], difficulty: Optional[int]) -> List:
+        candidates = self.__bank.select(category, difficulty)
+        if len(candidates) == 0:
+            raise QuizNotFound("No quiz of category {!r} and difficulty {} in {}".format(
+                category, difficulty, self.__bank.filename()))
+        unused = candidates[~self.__used[candidates]]
+        if len(unused) == 0:
+            logging.info("All the quizzes of category %r and difficulty %s were drawn, starting over",
+                         category, difficulty)
+            self.__used[candidates] = False
+            unused = candidates
+        return [self.__random.permutation(unused), 0]
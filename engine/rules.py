@@ -0,0 +1,310 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import List, Any, Generator, Optional, TYPE_CHECKING
+
+from enum import Enum
+from logging import getLogger
+
+if TYPE_CHECKING:
+    from engine.match import Match, TeamState
+
+logging = getLogger(__name__)
+
+# Effects of landing on a box, as simulated by the Simulator and the MarkovChain
+BOX = 0
+QUIZ = 1
+CHALLENGE = 2
+SKIP_THE_TURN = 3
+ROLL_THE_DICE_AGAIN = 4
+MOVE = 5
+
+
+class QuizNotFound(Exception):
+    '''The quiz of a box cannot be read from the board file or drawn from the quiz bank'''
+    pass
+
+
+class Quiz:
+
+    __slots__ = ("__question", "__answers", "__right_answers")
+
+    def __init__(self, question: str, answers: List[str], right_answers: List[bool]):
+        self.__question = question
+        self.__answers = answers
+        self.__right_answers = right_answers
+
+    def question(self):
+        return self.__question
+
+    def answers(self):
+        return self.__answers
+
+    def right_answers(self):
+        return self.__right_answers
+
+
+class Challenge:
+
+    __slots__ = ("__text",)
+
+    def __init__(self, text: str):
+        self.__text = text
+
+    def text(self):
+        return self.__text
+
+
+class Result(Enum):
+    FINISH_THE_TURN = 0
+    GO_ON = 1
+    CAME_BACK = 2
+
+
+class Request:
+    '''Input a turn waits for: a dice value, or whether a quiz or challenge was passed'''
+
+    class Kind(Enum):
+        ROLL = 0
+        QUIZ = 1
+        CHALLENGE = 2
+
+    __slots__ = ("kind", "team", "subject")
+
+    def __init__(self, kind: Request.Kind, team: TeamState, subject: Any = None):
+        self.kind = kind
+        self.team = team
+        self.subject = subject
+
+
+Step = Generator[Request, Any, Any]
+
+
+class BoxRule:
+    '''Game logic of a box, free of any graphics.
+
+    pre_execute and post_execute are generators: they yield a Request
+    whenever they need an input and get the answer sent back. Rules are
+    built from the box types of engine.boxtypes, which set the tag.
+    '''
+
+    __slots__ = ("idx", "tag")
+
+    TAG = ""
+    KIND = BOX
+
+    def __init__(self):
+        self.idx = None
+        self.tag = self.TAG
+
+    def caption(self) -> str:
+        '''Short text shown on the box, besides its number'''
+        return ""
+
+    def pre_execute(self, match: Match) -> Step:
+        yield from match.roll_the_dice()
+        return True
+
+    def post_execute(self, match: Match) -> Step:
+        yield from ()
+        return Result.FINISH_THE_TURN
+
+
+class StartRule(BoxRule):
+
+    __slots__ = ()
+
+    TAG = "start"
+
+
+class FinishRule(BoxRule):
+
+    __slots__ = ()
+
+    TAG = "finish"
+
+
+class QuizRule(BoxRule):
+
+    __slots__ = ("__quiz",)
+
+    TAG = "quiz"
+    KIND = QUIZ
+
+    def __init__(self, quiz: Quiz):
+        BoxRule.__init__(self)
+
+        self.__quiz = quiz
+
+    def quiz(self) -> Quiz:
+        return self.__quiz
+
+    def next_quiz(self, match: Match) -> Quiz:
+        '''Quiz asked to the team that lands on the box'''
+        return self.__quiz
+
+    def post_execute(self, match: Match) -> Step:
+        ret_value = Result.FINISH_THE_TURN
+        team = match.current_team()
+        try:
+            quiz = self.next_quiz(match)
+        except QuizNotFound as e:
+            # The team is not sent back for a question that cannot be asked
+            logging.warning("Skipping quiz: %s", e)
+            return ret_value
+        result = yield from match.request(Request(Request.Kind.QUIZ, team, quiz))
+        match.listener().answered(team, result)
+        if not result:
+            ret_value = Result.CAME_BACK
+        return ret_value
+
+
+class BankQuizRule(QuizRule):
+    '''Quiz box asking a new question from the quiz bank of the board every time'''
+
+    __slots__ = ("__category", "__difficulty")
+
+    def __init__(self, category: Optional[str] = None, difficulty: Optional[int] = None):
+        QuizRule.__init__(self, None)
+
+        self.__category = category
+        self.__difficulty = difficulty
+
+    def category(self) -> Optional[str]:
+        return self.__category
+
+    def difficulty(self) -> Optional[int]:
+        return self.__difficulty
+
+    def next_quiz(self, match: Match) -> Quiz:
+        return match.quizzes().draw(self.__category, self.__difficulty)
+
+
+class ChallengeRule(BoxRule):
+
+    __slots__ = ("__challenge",)
+
+    TAG = "challenge"
+    KIND = CHALLENGE
+
+    def __init__(self, challenge: Challenge):
+        BoxRule.__init__(self)
+
+        self.__challenge = challenge
+
+    def challenge(self) -> Challenge:
+        return self.__challenge
+
+    def post_execute(self, match: Match) -> Step:
+        ret_value = Result.FINISH_THE_TURN
+        team = match.current_team()
+        result = yield from match.request(Request(Request.Kind.CHALLENGE, team, self.__challenge))
+        match.listener().answered(team, result)
+        if not result:
+            ret_value = Result.CAME_BACK
+        return ret_value
+
+
+class SkipTurnRule(BoxRule):
+
+    __slots__ = ()
+
+    TAG = "skiptheturn"
+    KIND = SKIP_THE_TURN
+
+    def pre_execute(self, match: Match) -> Step:
+        ret_val = False
+        team = match.current_team()
+        if not team.skip_turn:
+            yield from match.roll_the_dice()
+            ret_val = True
+        else:
+            match.listener().turn_skipped(team)
+            team.skip_turn = False
+        return ret_val
+
+    def post_execute(self, match: Match) -> Step:
+        yield from ()
+        match.current_team().skip_turn = True
+        return Result.FINISH_THE_TURN
+
+
+class RollTheDiceAgainRule(BoxRule):
+
+    __slots__ = ()
+
+    TAG = "rollthediceagain"
+    KIND = ROLL_THE_DICE_AGAIN
+
+    def pre_execute(self, match: Match) -> Step:
+        yield from ()
+        return True
+
+    def post_execute(self, match: Match) -> Step:
+        yield from match.roll_the_dice()
+        return Result.GO_ON
+
+
+class MoveRule(BoxRule, ABC):
+    '''Box sending the team to another box, where the turn ends without the effect of that box'''
+
+    __slots__ = ()
+
+    KIND = MOVE
+
+    @abstractmethod
+    def destination(self) -> int:
+        pass
+
+    def post_execute(self, match: Match) -> Step:
+        yield from ()
+        team = match.current_team()
+        match.move_team(team, self.destination() - team.idx)
+        return Result.FINISH_THE_TURN
+
+
+class WarpRule(MoveRule):
+    '''Sends the team to box to'''
+
+    __slots__ = ("__to",)
+
+    TAG = "warp"
+
+    def __init__(self, to: int):
+        MoveRule.__init__(self)
+
+        if to < 0:
+            raise ValueError("Cannot warp to box {}".format(to))
+        self.__to = to
+
+    def to(self) -> int:
+        return self.__to
+
+    def destination(self) -> int:
+        return self.__to
+
+    def caption(self) -> str:
+        return "\u2192 {}".format(self.__to)
+
+
+class GoBackRule(MoveRule):
+    '''Sends the team steps boxes back, at most to the start'''
+
+    __slots__ = ("__steps",)
+
+    TAG = "goback"
+
+    def __init__(self, steps: int):
+        MoveRule.__init__(self)
+
+        if steps < 0:
+            raise ValueError("Cannot go back {} boxes".format(steps))
+        self.__steps = steps
+
+    def steps(self) -> int:
+        return self.__steps
+
+    def destination(self) -> int:
+        return max(0, self.idx - self.__steps)
+
+    def caption(self) -> str:
+        return "\u2190 {}".format(self.__steps)
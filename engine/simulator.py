@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from engine.board import Board
+from engine.rules import QUIZ, CHALLENGE, SKIP_THE_TURN, ROLL_THE_DICE_AGAIN, MOVE, MoveRule
+
+Probability = Union[float, Sequence[float]]
+
+
+class SimulationResult:
+
+    def __init__(self, winners: np.ndarray, turns: np.ndarray, visits: np.ndarray, teams: int):
+        self.__winners = winners
+        self.__turns = turns
+        self.__visits = visits
+        self.__teams = teams
+
+    def games(self) -> int:
+        return len(self.__winners)
+
+    def winners(self) -> np.ndarray:
+        '''Index of the winning team of every game, -1 if the game hit the turn limit'''
+        return self.__winners
+
+    def turns(self) -> np.ndarray:
+        '''Number of turns played in every game, summed over all teams'''
+        return self.__turns
+
+    def visits(self) -> np.ndarray:
+        '''Number of landings on each box, summed over all games and teams'''
+        return self.__visits
+
+    def rounds(self) -> np.ndarray:
+        return (self.__turns + self.__teams - 1) // self.__teams
+
+    def win_rates(self) -> np.ndarray:
+        finished = self.__winners[self.__winners >= 0]
+        return np.bincount(finished, minlength=self.__teams) / max(self.games(), 1)
+
+    def turns_histogram(self) -> np.ndarray:
+        return np.bincount(self.__turns)
+
+
+def landing_kinds(board: Board) -> np.ndarray:
+    '''Landing effect of each box of the board'''
+    return np.array([box.KIND for box in board.boxes()], dtype=np.int8)
+
+
+def destinations(board: Board) -> np.ndarray:
+    '''Box each box sends the teams to, the box itself if it does not move them'''
+    finish_idx = board.finish_idx()
+    return np.array([min(box.destination(), finish_idx) if isinstance(box, MoveRule) else idx
+                     for idx, box in enumerate(board.boxes())], dtype=np.int32)
+
+
+class Simulator:
+    '''Plays many independent games at once, one NumPy array lane per game.
+
+    Follows the same rules as Match.next(): a failed quiz or challenge brings
+    the team back to the box it started the turn from, and landing on a
+    rollthediceagain box rolls again and goes on from the new box. Warp and
+    goback boxes move the team to their destination and end the turn.
+    '''
+
+    def __init__(self,
+                 board: Board,
+                 teams: int,
+                 quiz_probability: Probability = 0.5,
+                 challenge_probability: Probability = 0.5,
+                 seed: Optional[int] = None,
+                 faces: int = 6):
+        self.__kinds = landing_kinds(board)
+        self.__destinations = destinations(board)
+        self.__finish_idx = len(self.__kinds) - 1
+        self.__teams = teams
+        self.__quiz_probability = np.broadcast_to(np.asarray(quiz_probability, dtype=float), (teams,))
+        self.__challenge_probability = np.broadcast_to(np.asarray(challenge_probability, dtype=float), (teams,))
+        self.__rng = np.random.default_rng(seed)
+        self.__faces = faces
+
+    def run(self, games: int, max_turns: int = 10000) -> SimulationResult:
+        positions = np.zeros((games, self.__teams), dtype=np.int32)
+        skip = np.zeros((games, self.__teams), dtype=bool)
+        winners = np.full(games, -1, dtype=np.int32)
+        turns = np.zeros(games, dtype=np.int32)
+        visits = np.zeros(len(self.__kinds), dtype=np.int64)
+
+        live = np.arange(games)
+        turn = 0
+        while (live.size > 0) and (turn < max_turns):
+            team = turn % self.__teams
+            pos = self.__turn(team, positions[live, team], skip, live, visits)
+            positions[live, team] = pos
+            turn += 1
+            turns[live] = turn
+
+            won = pos == self.__finish_idx
+            winners[live[won]] = team
+            live = live[~won]
+
+        return SimulationResult(winners, turns, visits, self.__teams)
+
+    def __turn(self, team: int, pos: np.ndarray, skip: np.ndarray, live: np.ndarray,
+               visits: np.ndarray) -> np.ndarray:
+        kinds = self.__kinds
+
+        # Teams resting on a skiptheturn box lose this turn
+        skipping = (kinds[pos] == SKIP_THE_TURN) & skip[live, team]
+        skip[live[skipping], team] = False
+
+        moving = np.flatnonzero(~skipping)
+        old = pos[moving]
+        new = self.__roll(old)
+
+        # Resolve the landing box, chaining rollthediceagain boxes
+        pending = np.arange(moving.size)
+        while pending.size > 0:
+            landed = new[pending]
+            visits += np.bincount(landed, minlength=len(kinds))
+            kind = kinds[landed]
+
+            failed = np.zeros(pending.size, dtype=bool)
+            quiz = kind == QUIZ
+            failed[quiz] = self.__rng.random(np.count_nonzero(quiz)) >= self.__quiz_probability[team]
+            challenge = kind == CHALLENGE
+            failed[challenge] = self.__rng.random(np.count_nonzero(challenge)) >= self.__challenge_probability[team]
+            came_back = pending[failed]
+            new[came_back] = old[came_back]
+
+            skip[live[moving[pending[kind == SKIP_THE_TURN]]], team] = True
+
+            sent = pending[kind == MOVE]
+            new[sent] = self.__destinations[new[sent]]
+
+            pending = pending[kind == ROLL_THE_DICE_AGAIN]
+            new[pending] = self.__roll(new[pending])
+
+        pos[moving] = new
+        return pos
+
+    def __roll(self, pos: np.ndarray) -> np.ndarray:
+        val = self.__rng.integers(1, self.__faces + 1, size=pos.size, dtype=np.int32)
+        return np.minimum(pos + val, self.__finish_idx)
@@ -0,0 +1,63 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QSize
+from PySide6.QtWidgets import QApplication
+
+from gameofthegoose import Game
+from gameofthegoose.export import EXPORTERS, SCENE_DPI
+from gameofthegoose.layout import SPIRAL, STRATEGIES
+from gui.resources import register_resources
+
+
+def parse_aspect(text: str) -> QSize:
+    width, _, height = text.partition(":")
+    return QSize(int(width), int(height))
+
+
+'''Exports a board at print resolution, without opening any window'''
+if __name__ == "__main__":
+
+    logging.basicConfig(format='%(asctime)s %(threadName)s %(module)s: %(message)s', level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Export a board to a PNG, SVG or PDF file for printing")
+    parser.add_argument("board", help="board file")
+    parser.add_argument("output", help="output file, the format is given by the extension: {}".format(
+        ", ".join(EXPORTERS)))
+    parser.add_argument("--dpi", type=float, default=300, help="print resolution")
+    parser.add_argument("--width-mm", type=float,
+                        help="printed width of the board (default: {} scene units per inch)".format(SCENE_DPI))
+    parser.add_argument("--layout", choices=STRATEGIES, default=SPIRAL)
+    parser.add_argument("--aspect", type=parse_aspect, default=QSize(16, 9), help="aspect of the layout, e.g. 16:9")
+    args = parser.parse_args()
+
+    exporter = EXPORTERS.get(os.path.splitext(args.output)[1].lower())
+    if exporter is None:
+        sys.exit("Unknown export format: {}".format(args.output))
+
+    app = QApplication(sys.argv[:1])
+    register_resources()
+
+    game = Game()
+    if not game.load(args.board):
+        sys.exit("Cannot load {}".format(args.board))
+    game.init_graphics(args.aspect, args.layout)
+
+    # The board items without the tile cache of the live view
+    scene = game.layer().static_scene()
+    rect = scene.itemsBoundingRect()
+    if args.width_mm is not None:
+        scale = args.dpi * args.width_mm / 25.4 / rect.width()
+    else:
+        scale = args.dpi / SCENE_DPI
+
+    start = time.perf_counter()
+    exporter(scene, rect, args.output, scale, args.dpi)
+    logging.info("Printed size %.0fx%.0f mm, exported in %.1f s",
+                 rect.width() * scale / args.dpi * 25.4, rect.height() * scale / args.dpi * 25.4,
+                 time.perf_counter() - start)
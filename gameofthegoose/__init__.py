@@ -1,2 +1,3 @@
 from gameofthegoose.gameofthegoose import Game
-from gameofthegoose.boxes import StartBox, FinishBox, RollTheDiceAgainBox, SkipTurnBox, QuizBox, ChallengeBox
+from gameofthegoose.teams import Team
+from gameofthegoose.boxes import Box
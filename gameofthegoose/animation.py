@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections import deque
+from math import hypot
+from typing import Dict, Deque, Iterable, Optional
+from logging import DEBUG, getLogger
+
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer, QPointF, Qt
+from PySide6.QtWidgets import QGraphicsItem
+
+logging = getLogger(__name__)
+
+FPS = 60
+SPEED = 1200.0
+# Items with more waypoints queued than this speed up to catch up
+CATCH_UP = 4
+
+
+class Animator(QObject):
+    '''Moves items along waypoints on one shared clock.
+
+    The clock only runs while something moves. Every frame advances all the
+    moving items by the real elapsed time, so late frames are skipped rather
+    than slowing the animation down. A new move for an item that is still
+    moving is queued after its current waypoints, and long queues are
+    played faster. The frame timings are logged at debug level whenever
+    everything stopped moving.
+    '''
+
+    def __init__(self, fps: int = FPS, speed: float = SPEED, parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        self.__budget_ms = 1000.0 / fps
+        self.__speed = speed
+        self.__paths: Dict[QGraphicsItem, Deque[QPointF]] = {}
+
+        self.__timer = QTimer(self)
+        self.__timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.__timer.setInterval(round(self.__budget_ms))
+        self.__timer.timeout.connect(self.__tick)
+        self.__clock = QElapsedTimer()
+        self.__work = QElapsedTimer()
+
+        self.reset_stats()
+
+    def move(self, item: QGraphicsItem, waypoints: Iterable[QPointF]):
+        path = self.__paths.get(item)
+        if path is None:
+            path = deque()
+            self.__paths[item] = path
+        path.extend(waypoints)
+        if not self.__timer.isActive():
+            self.__clock.start()
+            self.__timer.start()
+
+    def is_moving(self, item: QGraphicsItem) -> bool:
+        return item in self.__paths
+
+    def finish(self):
+        '''Jumps every moving item to its destination'''
+        for item, path in self.__paths.items():
+            item.setPos(path[-1])
+        self.__paths.clear()
+        self.__timer.stop()
+
+    def reset_stats(self):
+        self.__frames = 0
+        self.__skipped_frames = 0
+        self.__total_work_ms = 0.0
+        self.__max_work_ms = 0.0
+        self.__max_interval_ms = 0.0
+        self.__over_budget = 0
+
+    def stats(self) -> Dict[str, float]:
+        '''Per frame timing counters since the last reset_stats()'''
+        frames = max(self.__frames, 1)
+        return {"frames": self.__frames,
+                "skipped_frames": self.__skipped_frames,
+                "over_budget_frames": self.__over_budget,
+                "budget_ms": self.__budget_ms,
+                "mean_work_ms": self.__total_work_ms / frames,
+                "max_work_ms": self.__max_work_ms,
+                "max_interval_ms": self.__max_interval_ms}
+
+    def __tick(self):
+        self.__work.start()
+        elapsed_ms = self.__clock.restart()
+        self.__frames += 1
+        self.__max_interval_ms = max(self.__max_interval_ms, elapsed_ms)
+        missed = int(elapsed_ms / self.__budget_ms + 0.5) - 1
+        if missed > 0:
+            self.__skipped_frames += missed
+
+        distance = self.__speed * elapsed_ms / 1000.0
+        done = []
+        for item, path in self.__paths.items():
+            self.__advance(item, path, distance * max(1.0, len(path) / CATCH_UP))
+            if not path:
+                done.append(item)
+        for item in done:
+            del self.__paths[item]
+        if not self.__paths:
+            self.__timer.stop()
+
+        work_ms = self.__work.nsecsElapsed() / 1e6
+        self.__total_work_ms += work_ms
+        self.__max_work_ms = max(self.__max_work_ms, work_ms)
+        if work_ms > self.__budget_ms:
+            self.__over_budget += 1
+
+        if not self.__paths and logging.isEnabledFor(DEBUG):
+            logging.debug("Animation stopped: %s", ", ".join("{} {:.3g}".format(key, value)
+                                                             for key, value in self.stats().items()))
+
+    @staticmethod
+    def __advance(item: QGraphicsItem, path: Deque[QPointF], distance: float):
+        pos = item.pos()
+        while path and (distance > 0):
+            target = path[0]
+            dx = target.x() - pos.x()
+            dy = target.y() - pos.y()
+            length = hypot(dx, dy)
+            if length <= distance:
+                pos = target
+                distance -= length
+                path.popleft()
+            else:
+                pos = QPointF(pos.x() + dx * distance / length, pos.y() + dy * distance / length)
+                distance = 0
+        item.setPos(pos)
@@ -1,14 +1,16 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Optional, List
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QPixmap
+from typing import TYPE_CHECKING, Optional, List, Dict, Type, TypeVar
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QFont
 from PySide6.QtWidgets import QGraphicsTextItem, QGraphicsProxyWidget, QRadioButton, QGraphicsItemGroup, \
     QGraphicsPixmapItem, QGraphicsItem, QButtonGroup, QVBoxLayout, QGroupBox, QFrame, QPushButton, QDialog, QLabel, \
     QSpinBox, QDialogButtonBox, QMessageBox, QHBoxLayout
 
+from gameofthegoose.pixmaps import cached_pixmap
+
 if TYPE_CHECKING:
-    from gameofthegoose.boxes import Quiz, Challenge
-    from gameofthegoose.giocodelloca import Team
+    from engine.match import TeamState
+    from engine.rules import Quiz, Challenge
 
 
 class Dialog(QDialog):
@@ -21,28 +23,24 @@ class Dialog(QDialog):
 
         layout = QVBoxLayout(self)
         self._background = QLabel()
-        pixmap = QPixmap(":/images/message_background.png")
-        self._background.setPixmap(pixmap.scaled(600, 700, Qt.AspectRatioMode.KeepAspectRatio))
+        self._background.setPixmap(cached_pixmap(":/images/message_background.png", QSize(600, 700)))
         layout.addWidget(self._background)
 
 
 class RollTheDiceDialog(Dialog):
 
-    def __init__(self, team: Team, parent: Optional[QGraphicsItem] = None):
+    def __init__(self, team: Optional[TeamState] = None, parent: Optional[QGraphicsItem] = None):
         Dialog.__init__(self, parent)
 
-        s = "Team {}! \n ROLL THE DICE!".format(team.name())
-
         font = QFont("Times", 20)
 
         layout = QVBoxLayout(self._background)
         layout.setContentsMargins(100, 100, 100, 100)
 
-        question_text = QLabel()
-        question_text.setWordWrap(True)
-        question_text.setFont(font)
-        question_text.setText(s)
-        layout.addWidget(question_text)
+        self.__question_text = QLabel()
+        self.__question_text.setWordWrap(True)
+        self.__question_text.setFont(font)
+        layout.addWidget(self.__question_text)
 
         self.__spin_box = QSpinBox()
         self.__spin_box.setMinimum(1)
@@ -56,27 +54,31 @@ class RollTheDiceDialog(Dialog):
 
         button_box.accepted.connect(self.accept)
 
+        if team is not None:
+            self.set_team(team)
+
+    def set_team(self, team: TeamState):
+        self.__question_text.setText("Team {}! \n ROLL THE DICE!".format(team.name()))
+        self.__spin_box.setValue(1)
+
     def dice_value(self):
         return self.__spin_box.value()
 
 
 class SkipTheTurnDialog(Dialog):
 
-    def __init__(self, team: Team, parent: Optional[QGraphicsItem] = None):
+    def __init__(self, team: Optional[TeamState] = None, parent: Optional[QGraphicsItem] = None):
         Dialog.__init__(self, parent)
 
-        s = "Team {}! \n SKIP THE TURN!".format(team.name())
-
         font = QFont("Times", 20)
 
         layout = QVBoxLayout(self._background)
         layout.setContentsMargins(100, 100, 100, 100)
 
-        question_text = QLabel()
-        question_text.setWordWrap(True)
-        question_text.setFont(font)
-        question_text.setText(s)
-        layout.addWidget(question_text)
+        self.__question_text = QLabel()
+        self.__question_text.setWordWrap(True)
+        self.__question_text.setFont(font)
+        layout.addWidget(self.__question_text)
 
         button_box = QDialogButtonBox()
         button_box.setStandardButtons(QDialogButtonBox.StandardButton.Ok)
@@ -85,44 +87,65 @@ class SkipTheTurnDialog(Dialog):
 
         button_box.accepted.connect(self.accept)
 
+        if team is not None:
+            self.set_team(team)
+
+    def set_team(self, team: TeamState):
+        self.__question_text.setText("Team {}! \n SKIP THE TURN!".format(team.name()))
+
 
 class QuizDialog(Dialog):
 
-    def __init__(self, quiz: Quiz, parent: Optional[QGraphicsItem] = None):
+    def __init__(self, quiz: Optional[Quiz] = None, parent: Optional[QGraphicsItem] = None):
         Dialog.__init__(self, parent)
 
-        self.__quiz = quiz
+        self.__quiz = None
 
         font = QFont("Times", 20)
 
-        layout = QVBoxLayout(self._background)
-        layout.setContentsMargins(100, 100, 100, 100)
-        question_text = QLabel()
-        question_text.setWordWrap(True)
-        question_text.setFont(font)
-        question_text.setText(quiz.question())
-        layout.addWidget(question_text)
+        self.__layout = QVBoxLayout(self._background)
+        self.__layout.setContentsMargins(100, 100, 100, 100)
+        self.__question_text = QLabel()
+        self.__question_text.setWordWrap(True)
+        self.__question_text.setFont(font)
+        self.__layout.addWidget(self.__question_text)
 
-        font = QFont("Times", 14)
+        self.__answers_layout = QVBoxLayout()
+        self.__layout.addLayout(self.__answers_layout)
         self.__radio_buttons: List[QRadioButton] = []
-        for answer in quiz.answers():
-            h_layout = QHBoxLayout()
-            radio_button = QRadioButton()
-            radio_button.setFont(font)
-            radio_button.setText(answer)
-            h_layout.addWidget(radio_button)
-            self.__radio_buttons.append(radio_button)
-            layout.addLayout(h_layout)
 
         button_box = QDialogButtonBox()
         button_box.setStandardButtons(QDialogButtonBox.StandardButton.Ok)
-        layout.addWidget(button_box)
+        self.__layout.addWidget(button_box)
 
         button_box.accepted.connect(self.accept)
 
+        if quiz is not None:
+            self.set_quiz(quiz)
+
+    def set_quiz(self, quiz: Quiz):
+        self.__quiz = quiz
+        self.__question_text.setText(quiz.question())
+
+        # Radio buttons are reused between quizzes, only missing ones are created
+        font = QFont("Times", 14)
+        answers = quiz.answers()
+        while len(self.__radio_buttons) < len(answers):
+            radio_button = QRadioButton()
+            radio_button.setFont(font)
+            self.__answers_layout.addWidget(radio_button)
+            self.__radio_buttons.append(radio_button)
+        for i, radio_button in enumerate(self.__radio_buttons):
+            radio_button.setAutoExclusive(False)
+            radio_button.setChecked(False)
+            radio_button.setAutoExclusive(True)
+            radio_button.setVisible(i < len(answers))
+            if i < len(answers):
+                radio_button.setText(answers[i])
+
     def quiz_result(self) -> bool:
         result = True
-        for i in range(0, len(self.__radio_buttons)):
+        for i in range(0, len(self.__quiz.answers())):
             if self.__quiz.right_answers()[i] != self.__radio_buttons[i].isChecked():
                 result = False
         return result
@@ -130,10 +153,10 @@ class QuizDialog(Dialog):
 
 class ChallengeDialog(Dialog):
 
-    def __init__(self, challenge: Challenge, parent: Optional[QGraphicsItem] = None):
+    def __init__(self, challenge: Optional[Challenge] = None, parent: Optional[QGraphicsItem] = None):
         Dialog.__init__(self, parent)
 
-        self.__challenge = challenge
+        self.__challenge = None
 
         font = QFont("Times", 20)
 
@@ -141,16 +164,22 @@ class ChallengeDialog(Dialog):
         button_box = QDialogButtonBox()
         button_box.setStandardButtons(QDialogButtonBox.StandardButton.Yes | QDialogButtonBox.StandardButton.No)
         layout.setContentsMargins(100, 100, 100, 100)
-        challenge_text = QLabel()
-        challenge_text.setWordWrap(True)
-        challenge_text.setFont(font)
-        challenge_text.setText(challenge.text())
-        layout.addWidget(challenge_text)
+        self.__challenge_text = QLabel()
+        self.__challenge_text.setWordWrap(True)
+        self.__challenge_text.setFont(font)
+        layout.addWidget(self.__challenge_text)
         layout.addWidget(button_box)
 
         button_box.accepted.connect(self.accept)
         button_box.rejected.connect(self.reject)
 
+        if challenge is not None:
+            self.set_challenge(challenge)
+
+    def set_challenge(self, challenge: Challenge):
+        self.__challenge = challenge
+        self.__challenge_text.setText(challenge.text())
+
     def challenge_result(self) -> bool:
         result = False
         if self.result() == 1:
@@ -165,8 +194,7 @@ class YesDialog(QDialog):
 
         layout = QVBoxLayout(self)
         self._background = QLabel()
-        pixmap = QPixmap(":/images/yes.gif")
-        self._background.setPixmap(pixmap)
+        self._background.setPixmap(cached_pixmap(":/images/yes.gif"))
         layout.addWidget(self._background)
 
 
@@ -177,31 +205,54 @@ class NoDialog(QDialog):
 
         layout = QVBoxLayout(self)
         self._background = QLabel()
-        pixmap = QPixmap(":/images/no.jpg")
-        self._background.setPixmap(pixmap)
+        self._background.setPixmap(cached_pixmap(":/images/no.jpg"))
         layout.addWidget(self._background)
 
 
 class WinnerDialog(QDialog):
 
-    def __init__(self, team: Team, parent: Optional[QGraphicsItem] = None):
+    def __init__(self, team: Optional[TeamState] = None, parent: Optional[QGraphicsItem] = None):
         QDialog.__init__(self, parent)
 
         layout = QVBoxLayout(self)
         self._background = QLabel()
-        pixmap = QPixmap(":/images/winner.png")
-        self._background.setPixmap(pixmap)
+        self._background.setPixmap(cached_pixmap(":/images/winner.png"))
         layout.addWidget(self._background)
 
-        s = "The winner is {}!".format(team.name())
-
         font = QFont("Times", 20)
 
         layout = QVBoxLayout(self._background)
         layout.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop)
 
-        text = QLabel()
-        text.setWordWrap(True)
-        text.setFont(font)
-        text.setText(s)
-        layout.addWidget(text)
+        self.__text = QLabel()
+        self.__text.setWordWrap(True)
+        self.__text.setFont(font)
+        layout.addWidget(self.__text)
+
+        if team is not None:
+            self.set_team(team)
+
+    def set_team(self, team: TeamState):
+        self.__text.setText("The winner is {}!".format(team.name()))
+
+
+D = TypeVar("D", bound=QDialog)
+
+
+class DialogPool:
+    '''Keeps one instance of each dialog class, to be rebound to new content every turn'''
+
+    def __init__(self):
+        self.__dialogs: Dict[type, QDialog] = {}
+
+    def dialog(self, dialog_class: Type[D]) -> D:
+        dialog = self.__dialogs.get(dialog_class)
+        if dialog is None:
+            dialog = dialog_class()
+            self.__dialogs[dialog_class] = dialog
+        return dialog
+
+    def preload(self):
+        for dialog_class in (RollTheDiceDialog, SkipTheTurnDialog, QuizDialog, ChallengeDialog, YesDialog, NoDialog,
+                             WinnerDialog):
+            self.dialog(dialog_class)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from math import ceil
+from typing import BinaryIO
+from logging import getLogger
+
+import numpy as np
+from PySide6.QtCore import QMarginsF, QRectF, QSize, QSizeF, Qt
+from PySide6.QtGui import QImage, QPageLayout, QPageSize, QPainter, QPdfWriter
+from PySide6.QtSvg import QSvgGenerator
+from PySide6.QtWidgets import QGraphicsScene
+
+logging = getLogger(__name__)
+
+# Scene units per inch, the scene is laid out in logical pixels
+SCENE_DPI = 96
+
+# Memory budget of a band of the PNG export
+BAND_BYTES = 32 * 1024 * 1024
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class PngWriter:
+    '''Streaming PNG encoder: RGB rows are compressed as they come, the image is never held whole'''
+
+    def __init__(self, file: BinaryIO, width: int, height: int, dpi: float = SCENE_DPI):
+        self.__file = file
+        self.__width = width
+        self.__height = height
+        self.__rows = 0
+        self.__compressor = zlib.compressobj(6)
+
+        file.write(_PNG_SIGNATURE)
+        self.__chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        ppm = round(dpi / 0.0254)
+        self.__chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1))
+
+    def write_rows(self, rgb: np.ndarray):
+        '''Appends rows given as an array of shape (rows, width * 3)'''
+        rows = np.empty((rgb.shape[0], self.__width * 3 + 1), dtype=np.uint8)
+        # Filter type 0, the rows are stored as they are
+        rows[:, 0] = 0
+        rows[:, 1:] = rgb
+        self.__rows += rgb.shape[0]
+        self.__idat(self.__compressor.compress(rows.tobytes()))
+
+    def close(self):
+        if self.__rows != self.__height:
+            raise ValueError("{} rows written out of {}".format(self.__rows, self.__height))
+        self.__idat(self.__compressor.flush())
+        self.__chunk(b"IEND", b"")
+
+    def __idat(self, data: bytes):
+        if data:
+            self.__chunk(b"IDAT", data)
+
+    def __chunk(self, kind: bytes, data: bytes):
+        self.__file.write(struct.pack(">I", len(data)) + kind + data +
+                          struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+
+def export_size(rect: QRectF, scale: float) -> QSize:
+    '''Pixel size of the rect of the scene rendered at scale'''
+    return QSize(max(1, ceil(rect.width() * scale)), max(1, ceil(rect.height() * scale)))
+
+
+def _prepare(painter: QPainter):
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+
+
+def export_png(scene: QGraphicsScene, rect: QRectF, filename: str, scale: float, dpi: float = SCENE_DPI):
+    '''Renders the rect of the scene in horizontal bands streamed to a PNG file.
+
+    Memory is bounded by BAND_BYTES whatever the size of the image.
+    '''
+    size = export_size(rect, scale)
+    band_rows = max(1, min(size.height(), BAND_BYTES // (size.width() * 3)))
+    image = QImage(size.width(), band_rows, QImage.Format.Format_RGB888)
+    with open(filename, "wb") as file:
+        writer = PngWriter(file, size.width(), size.height(), dpi)
+        for top in range(0, size.height(), band_rows):
+            rows = min(band_rows, size.height() - top)
+            image.fill(Qt.GlobalColor.white)
+            painter = QPainter(image)
+            _prepare(painter)
+            scene.render(painter, QRectF(0, 0, size.width(), rows),
+                         QRectF(rect.left(), rect.top() + top / scale, size.width() / scale, rows / scale),
+                         Qt.AspectRatioMode.IgnoreAspectRatio)
+            painter.end()
+            bits = np.frombuffer(image.constBits(), dtype=np.uint8, count=image.sizeInBytes())
+            writer.write_rows(bits.reshape(band_rows, image.bytesPerLine())[:rows, :size.width() * 3])
+        writer.close()
+    logging.info("Exported %dx%d pixels to %s", size.width(), size.height(), filename)
+
+
+def export_svg(scene: QGraphicsScene, rect: QRectF, filename: str, scale: float, dpi: float = SCENE_DPI):
+    '''Renders the rect of the scene to an SVG file, the pixmaps in it are embedded at scale'''
+    size = export_size(rect, scale)
+    generator = QSvgGenerator()
+    generator.setFileName(filename)
+    generator.setSize(size)
+    generator.setViewBox(QRectF(0, 0, size.width(), size.height()))
+    generator.setResolution(round(dpi))
+    painter = QPainter(generator)
+    _prepare(painter)
+    scene.render(painter, QRectF(0, 0, size.width(), size.height()), rect, Qt.AspectRatioMode.IgnoreAspectRatio)
+    painter.end()
+    logging.info("Exported %s", filename)
+
+
+def export_pdf(scene: QGraphicsScene, rect: QRectF, filename: str, scale: float, dpi: float = SCENE_DPI):
+    '''Renders the rect of the scene to a single page PDF file, sized to print at dpi'''
+    writer = QPdfWriter(filename)
+    writer.setResolution(round(dpi))
+    inches = QSizeF(rect.width() * scale / dpi, rect.height() * scale / dpi)
+    writer.setPageLayout(QPageLayout(QPageSize(inches, QPageSize.Unit.Inch, "", QPageSize.SizeMatchPolicy.ExactMatch),
+                                     QPageLayout.Orientation.Portrait, QMarginsF()))
+    painter = QPainter(writer)
+    _prepare(painter)
+    scene.render(painter, QRectF(painter.viewport()), rect, Qt.AspectRatioMode.KeepAspectRatio)
+    painter.end()
+    logging.info("Exported %s", filename)
+
+
+EXPORTERS = {
+    ".png": export_png,
+    ".svg": export_svg,
+    ".pdf": export_pdf,
+}
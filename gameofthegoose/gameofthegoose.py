@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Dict
 from logging import getLogger
 
-from PySide6.QtCore import QPoint, QLine, QFile, QIODevice
-from PySide6.QtGui import QPen, QColor, QPixmap
-from PySide6.QtWidgets import QGraphicsLineItem, QGraphicsItemGroup, QGraphicsPixmapItem
-from PySide6.QtXml import QDomDocument, QDomElement
-
-from gameofthegoose.boxes import Box, StartBox, FinishBox, Quiz, QuizBox, Challenge, ChallengeBox, SkipTurnBox, \
-    RollTheDiceAgainBox
-from gameofthegoose.dialogs import RollTheDiceDialog, WinnerDialog
+from PySide6.QtCore import QPoint, QPointF, QSize
+from PySide6.QtWidgets import QGraphicsItemGroup, QGraphicsPixmapItem
+
+from engine.board import Board
+from engine.match import Match, TeamState
+from gameofthegoose.animation import Animator
+from gameofthegoose.boxes import Box
+from gameofthegoose.dialogs import DialogPool
+from gameofthegoose.layer import StaticLayer
+from gameofthegoose.layout import SPIRAL, layout_positions
+from gameofthegoose.pixmaps import cached_pixmap
 from gameofthegoose.teams import Team
+from gameofthegoose.track import Track
+from gameofthegoose.turns import GameListener, TurnMachine
 
 logging = getLogger(__name__)
 
@@ -24,178 +29,102 @@ class Game(QGraphicsItemGroup):
 
         self.__box_size = 120
 
+        self.__dialogs = DialogPool()
+        self.__board = Board()
+        self.__match = Match(self.__board, listener=GameListener(self, self.__dialogs))
+        self.__turns = TurnMachine(self.__match, self.__dialogs)
+        self.__animator = Animator()
+
         self.__boxes: List[Box] = []
-        self.__teams: List[Team] = []
+        self.__teams: Dict[TeamState, Team] = {}
+        self.__track = Track()
+        self.__track.setZValue(-1)
 
-        self.__team_idx = 0
+        # Board artwork is painted from cached tiles, only the team tokens are live items
+        self.__layer = StaticLayer()
+        self.__layer.setZValue(-1)
+        self.addToGroup(self.__layer)
 
     def load(self, filename: str) -> bool:
-        ret = False
-        doc = QDomDocument()
-        file = QFile(filename)
-        if file.open(QIODevice.OpenModeFlag.ReadOnly):
-            if doc.setContent(file):
-                self.__load(doc)
-                ret = True
-            file.close()
+        ret = self.__board.load(filename)
+        if ret:
+            types = self.__board.types()
+            for rule in self.__board.boxes():
+                box_type = types.get(rule.tag)
+                self.add_box(Box(rule, box_type.image if box_type is not None else None))
         return ret
 
-    def __load(self, doc: QDomDocument):
-        root = doc.documentElement()
-        node = root.firstChild()
-        while not node.isNull():
-            el = node.toElement()
-            if not el.isNull():
-                name = el.tagName()
-                if name == "start":
-                    box = StartBox()
-                    self.add_box(box)
-                if name == "quiz":
-                    self.__load_quiz(el)
-                if name == "challenge":
-                    self.__load_challenge(el)
-                if name == "rollthediceagain":
-                    box = RollTheDiceAgainBox()
-                    self.add_box(box)
-                if name == "skiptheturn":
-                    box = SkipTurnBox()
-                    self.add_box(box)
-                if name == "finish":
-                    box = FinishBox()
-                    self.add_box(box)
-            node = node.nextSibling()
-
-    def __load_quiz(self, el: QDomElement):
-        question = el.attribute("question", "")
-        answers = []
-        right_answers = []
-        answer_node = el.firstChild()
-        while not answer_node.isNull():
-            answer_el = answer_node.toElement()
-            if not answer_el.isNull():
-                if answer_el.tagName() == "answer":
-                    answer = answer_el.attribute("text", "")
-                    if answer.endswith("*"):
-                        right_answers.append(True)
-                        answer = answer[:-2]
-                    else:
-                        right_answers.append(False)
-                    answers.append(answer)
-            answer_node = answer_node.nextSibling()
-        quiz = Quiz(question, answers, right_answers)
-        quiz_box = QuizBox(quiz)
-        self.add_box(quiz_box)
-
-    def __load_challenge(self, el: QDomElement):
-        text = el.attribute("text", "")
-        challenge = Challenge(text)
-        challenge_box = ChallengeBox(challenge)
-        self.add_box(challenge_box)
-
     def add_box(self, box: Box):
-        box.setParentItem(self)
         self.__boxes.insert(len(self.__boxes), box)
 
     def add_team(self, team: Team):
-        self.__teams.insert(len(self.__teams) - 1, team)
+        team.set_animator(self.__animator)
+        self.__teams[team.state()] = team
+        self.__match.add_team(team.state())
+
+    def dialogs(self) -> DialogPool:
+        return self.__dialogs
+
+    def board(self) -> Board:
+        return self.__board
+
+    def match(self) -> Match:
+        return self.__match
+
+    def animator(self) -> Animator:
+        return self.__animator
+
+    def turns(self) -> TurnMachine:
+        return self.__turns
 
     def boxes(self) -> List[Box]:
         return self.__boxes
 
-    def init_graphics(self):
-        item = QGraphicsPixmapItem(QPixmap(":/images/game_background.jpg"))
-        item.setScale(1.5)
+    def layer(self) -> StaticLayer:
+        return self.__layer
+
+    def track(self) -> Track:
+        return self.__track
+
+    def team(self, state: TeamState) -> Team:
+        return self.__teams[state]
+
+    def init_graphics(self, viewport: QSize = QSize(16, 9), strategy: str = SPIRAL):
+        box_size = self.__box_size
+        positions = layout_positions(len(self.__boxes), strategy, (viewport.width(), viewport.height()), box_size)
+
+        item = QGraphicsPixmapItem(cached_pixmap(":/images/game_background.jpg"))
+        if (len(positions) > 0) and (item.boundingRect().width() > 0):
+            width = max(x for x, _ in positions) + box_size + 25
+            height = max(y for _, y in positions) + box_size + 25
+            item.setScale(max(1.5,
+                              width / item.boundingRect().width(),
+                              height / item.boundingRect().height()))
+        else:
+            item.setScale(1.5)
         item.setZValue(-2)
-        self.addToGroup(item)
-
-        i = 0
-        box_size = 120
-        x_interbox = 70
-        y_interbox = 25
-
-        p = [[0, 0], [1, 0], [2, 0], [3, 0], [4, 0], [5, 0], [6, 0], [7, 0],
-             [7, 1], [7, 2], [7, 3], [7, 4],
-             [6, 4], [5, 4], [4, 4], [3, 4], [2, 4], [1, 4], [0, 4],
-             [0, 3], [0, 2], [1, 2], [2, 2], [3, 2], [4, 2], [5, 2], [6, 2]]
-
-        p_old = None
-        for box in self.__boxes:
-            pp = QPoint(25 + p[i][0] * (box_size + x_interbox), 25 + p[i][1] * (box_size + y_interbox))
-            box.init_graphics(self.__box_size)
+        self.__layer.add_item(item)
+
+        for i, box in enumerate(self.__boxes):
             box.idx = i
-            box.setPos(pp)
-            self.addToGroup(box)
-            if p_old is not None:
-                pen = QPen()
-                pen.setWidth(20)
-                pen.setColor(QColor(0, 0, 255))
-                item = QGraphicsLineItem(QLine(p_old.x() + (box_size / 2),
-                                               p_old.y() + (box_size / 2),
-                                               pp.x() + (box_size / 2),
-                                               pp.y() + (box_size / 2)))
-                item.setPen(pen)
-                item.setZValue(-1)
-                self.addToGroup(item)
-            p_old = pp
-            i += 1
-
-        for team in self.__teams:
+            box.init_graphics(self.__box_size, len(self.__boxes))
+            box.setPos(QPoint(*positions[i]))
+            self.__layer.add_item(box)
+
+        self.__track.set_points([QPointF(x + box_size / 2, y + box_size / 2) for x, y in positions])
+        self.__layer.add_item(self.__track)
+        self.__layer.invalidate()
+
+        for team in self.__teams.values():
             team.init_graphics(50)
-            team.set_box(self.__boxes[0])
+            team.set_box(self.__boxes[team.state().idx])
             self.addToGroup(team)
 
-    def next(self):
-
-        team = self.current_team()
-        box = team.box()
-        old_idx = box.idx
-
-        run = True
-        while run:
-            ret = box.pre_execute(self)
-            if ret:
-                box = team.box()
-                result = box.post_execute(self)
-                if result == Box.Result.FINISH_THE_TURN:
-                    run = False
-                elif result == Box.Result.CAME_BACK:
-                    team.set_box(self.__boxes[old_idx])
-                    run = False
-                elif result == Box.Result.GO_ON:
-                    run = True
-            else:
-                run = False
-
-        self.__next_team()
+    def next(self) -> bool:
+        return self.__turns.start()
 
     def finish(self):
         pass
 
-    def current_team(self):
-        return self.__teams[self.__team_idx]
-
-    def move_team(self, team: Team, val: int):
-        box = team.box()
-        idx = box.idx + val
-        if idx < (len(self.__boxes) - 1):
-            team.set_box(self.__boxes[idx])
-        else:
-            team.set_box(self.__boxes[(len(self.__boxes) - 1)])
-            team = self.current_team()
-            dialog = WinnerDialog(team)
-            dialog.exec_()
-
-    def roll_the_dice(self):
-        team = self.current_team()
-        box = team.box()
-        start_idx = box.idx
-        if start_idx < (len(self.__boxes) - 1):
-            dialog = RollTheDiceDialog(team)
-            dialog.exec_()
-            val = dialog.dice_value()
-            self.move_team(team, val)
-
-    def __next_team(self):
-        self.__team_idx += 1
-        if self.__team_idx >= len(self.__teams):
-            self.__team_idx = 0
+    def current_team(self) -> Team:
+        return self.__teams[self.__match.current_team()]
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from math import ceil, floor, log2
+from typing import Optional, Tuple
+
+from PySide6.QtCore import QRectF, Qt
+from PySide6.QtGui import QPainter, QPixmap
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsScene, QStyleOptionGraphicsItem, QWidget
+
+TILE_SIZE = 512
+
+# Tiles kept across zoom levels, 256 tiles of 512x512 ARGB are 256 MB
+MAX_TILES = 256
+
+# Zoom levels the tiles are rendered at, per doubling of the scale
+LEVELS_PER_OCTAVE = 4
+
+# Static items per leaf of the BSP index of the private scene
+ITEMS_PER_LEAF = 8
+
+
+def bsp_depth(count: int) -> int:
+    '''BSP tree depth giving about ITEMS_PER_LEAF items per leaf'''
+    return min(16, max(1, ceil(log2(max(count, 1) / ITEMS_PER_LEAF))))
+
+
+def tile_level(scale: float) -> int:
+    '''Zoom level of the tiles painted at scale, tiles are only ever scaled down'''
+    return ceil(log2(scale) * LEVELS_PER_OCTAVE - 1e-9)
+
+
+class StaticLayer(QGraphicsItem):
+    '''Paints items that never move from pixmap tiles rendered once per zoom level.
+
+    The items live in a private scene; the tiles are rendered on demand when
+    they are first exposed, at the closest zoom level above the view scale,
+    and the least recently painted ones are dropped past MAX_TILES. Zooming
+    within a level only rescales the tiles already rendered.
+    '''
+
+    def __init__(self, parent: Optional[QGraphicsItem] = None):
+        QGraphicsItem.__init__(self, parent)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+
+        # The items are top level so that the index culls them when rendering a tile
+        self.__scene = QGraphicsScene()
+
+        self.__bounds = QRectF()
+        self.__tiles: OrderedDict[Tuple[int, int, int], QPixmap] = OrderedDict()
+
+    def static_scene(self) -> QGraphicsScene:
+        '''Private scene of the static items, its coordinates match the layer ones'''
+        return self.__scene
+
+    def add_item(self, item: QGraphicsItem):
+        '''Adds a static item, call invalidate() once done'''
+        self.__scene.addItem(item)
+
+    def invalidate(self):
+        self.prepareGeometryChange()
+        self.__bounds = self.__scene.itemsBoundingRect()
+        # A fixed scene rect and a depth fitting the item count spare the index any later rebuild
+        self.__scene.setSceneRect(self.__bounds)
+        self.__scene.setBspTreeDepth(bsp_depth(len(self.__scene.items())))
+        self.__tiles.clear()
+        self.update()
+
+    def tiles(self) -> int:
+        return len(self.__tiles)
+
+    def boundingRect(self) -> QRectF:
+        return self.__bounds
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = None):
+        transform = painter.worldTransform()
+        dpr = painter.device().devicePixelRatioF()
+        scale = max(abs(transform.m11()), abs(transform.m12())) * dpr
+        if scale <= 0:
+            return
+        level = tile_level(scale)
+        if 2 ** (level / LEVELS_PER_OCTAVE) != scale:
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+
+        tile = TILE_SIZE / 2 ** (level / LEVELS_PER_OCTAVE)
+        exposed = option.exposedRect.intersected(self.__bounds)
+        left = self.__bounds.left()
+        top = self.__bounds.top()
+        for ty in range(floor((exposed.top() - top) / tile), floor((exposed.bottom() - top) / tile) + 1):
+            for tx in range(floor((exposed.left() - left) / tile), floor((exposed.right() - left) / tile) + 1):
+                target = QRectF(left + tx * tile, top + ty * tile, tile, tile)
+                painter.drawPixmap(target, self.__tile(level, tx, ty, target), QRectF(0, 0, TILE_SIZE, TILE_SIZE))
+
+    def __tile(self, level: int, tx: int, ty: int, source: QRectF) -> QPixmap:
+        key = (level, tx, ty)
+        pixmap = self.__tiles.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(TILE_SIZE, TILE_SIZE)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            self.__scene.render(painter, QRectF(0, 0, TILE_SIZE, TILE_SIZE), source,
+                                Qt.AspectRatioMode.IgnoreAspectRatio)
+            painter.end()
+            self.__tiles[key] = pixmap
+            if len(self.__tiles) > MAX_TILES:
+                self.__tiles.popitem(last=False)
+        else:
+            self.__tiles.move_to_end(key)
+        return pixmap
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from math import ceil, sqrt
+from typing import Tuple, List
+
+SERPENTINE = "serpentine"
+SPIRAL = "spiral"
+GRID_SNAKE = "grid-snake"
+
+STRATEGIES = (SERPENTINE, SPIRAL, GRID_SNAKE)
+
+Cells = Tuple[Tuple[int, int], ...]
+
+
+def _serpentine(count: int, cols: int) -> Cells:
+    cells = []
+    for i in range(count):
+        row, col = divmod(i, cols)
+        if row % 2 == 1:
+            col = cols - 1 - col
+        cells.append((col, row))
+    return tuple(cells)
+
+
+def _grid_snake(count: int, cols: int) -> Cells:
+    '''Rows of boxes on even grid rows, joined by a single box at alternating ends'''
+    cells = []
+    row = 0
+    while len(cells) < count:
+        for col in range(cols):
+            if len(cells) < count:
+                cells.append((col if row % 4 == 0 else cols - 1 - col, row))
+        if len(cells) < count:
+            cells.append((cols - 1 if row % 4 == 0 else 0, row + 1))
+        row += 2
+    return tuple(cells)
+
+
+def _spiral(count: int, cols: int, rows: int) -> Cells:
+    '''Clockwise spiral leaving an empty row or column between its rings'''
+    visited = set()
+    cells: List[Tuple[int, int]] = []
+    directions = ((1, 0), (0, 1), (-1, 0), (0, -1))
+    d = 0
+    col, row = 0, 0
+
+    def free(c: int, r: int) -> bool:
+        return (0 <= c < cols) and (0 <= r < rows) and ((c, r) not in visited)
+
+    while len(cells) < count:
+        cells.append((col, row))
+        visited.add((col, row))
+        moved = False
+        for turn in range(2):
+            dc, dr = directions[(d + turn) % 4]
+            c, r = col + dc, row + dr
+            # Keep the gap with the previous ring, unless the path reaches the border
+            if free(c, r) and ((c + dc, r + dr) not in visited):
+                col, row = c, r
+                d = (d + turn) % 4
+                moved = True
+                break
+        if not moved:
+            break
+    return tuple(cells)
+
+
+def _capacity(strategy: str, cols: int, rows: int) -> int:
+    if strategy == SERPENTINE:
+        return cols * rows
+    if strategy == GRID_SNAKE:
+        return ((rows + 1) // 2) * cols + rows // 2
+    return len(_spiral(cols * rows, cols, rows))
+
+
+@lru_cache(maxsize=64)
+def layout_cells(count: int, strategy: str, viewport: Tuple[int, int], cell_aspect: float = 1.0) -> Cells:
+    '''Grid cells (column, row) of count boxes along the path, filling a viewport of the given aspect.
+
+    cell_aspect is the width of a grid cell over its height.
+    '''
+    if strategy not in STRATEGIES:
+        raise ValueError("Unknown layout strategy {}".format(strategy))
+    if count <= 0:
+        return ()
+    aspect = (viewport[0] / max(viewport[1], 1)) / cell_aspect
+
+    # Paths with gaps only fill about half of the grid
+    density = 1.0 if strategy == SERPENTINE else 0.5
+    rows = max(1, int(sqrt(count / density / aspect)))
+    cols = max(1, ceil(rows * aspect))
+    while _capacity(strategy, cols, rows) < count:
+        rows += 1
+        cols = max(1, ceil(rows * aspect))
+
+    if strategy == SERPENTINE:
+        return _serpentine(count, cols)
+    if strategy == GRID_SNAKE:
+        return _grid_snake(count, cols)
+    return _spiral(count, cols, rows)
+
+
+@lru_cache(maxsize=64)
+def layout_positions(count: int,
+                     strategy: str,
+                     viewport: Tuple[int, int],
+                     box_size: int = 120,
+                     x_interbox: int = 70,
+                     y_interbox: int = 25,
+                     margin: int = 25) -> Tuple[Tuple[int, int], ...]:
+    '''Top left corner of every box in scene coordinates'''
+    x_step = box_size + x_interbox
+    y_step = box_size + y_interbox
+    cells = layout_cells(count, strategy, viewport, x_step / y_step)
+    return tuple((margin + col * x_step, margin + row * y_step) for col, row in cells)
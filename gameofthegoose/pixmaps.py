@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from PySide6.QtCore import QSize, Qt
+from PySide6.QtGui import QImage, QPixmap, QPixmapCache, QImageReader, QGuiApplication
+
+DEFAULT_BUDGET_KB = 64 * 1024
+
+
+def set_budget(kb: int):
+    '''Memory budget of the process wide pixmap cache, least recently used pixmaps are evicted first'''
+    QPixmapCache.setCacheLimit(kb)
+
+
+def device_pixel_ratio(dpr: Optional[float] = None) -> float:
+    if dpr is None:
+        app = QGuiApplication.instance()
+        dpr = app.devicePixelRatio() if app is not None else 1.0
+    return dpr
+
+
+def pixmap_key(path: str, size: Optional[QSize], dpr: float) -> str:
+    return "{}@{}x{}@{}".format(path, size.width() if size else 0, size.height() if size else 0, dpr)
+
+
+def decode_image(path: str, size: Optional[QSize], dpr: float) -> QImage:
+    '''Decodes an image file straight to the largest size that fits size, safe on any thread'''
+    reader = QImageReader(path)
+    if (size is not None) and reader.size().isValid():
+        reader.setScaledSize(reader.size().scaled(size * dpr, Qt.AspectRatioMode.KeepAspectRatio))
+    return reader.read()
+
+
+def cached_pixmap(path: str, size: Optional[QSize] = None, dpr: Optional[float] = None) -> QPixmap:
+    '''Pixmap of an image file decoded once per (path, size, device pixel ratio).
+
+    With a size, the image is decoded straight to the largest size that fits
+    it keeping the aspect ratio; the returned pixmap has that logical size.
+    '''
+    dpr = device_pixel_ratio(dpr)
+    key = pixmap_key(path, size, dpr)
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None:
+        pixmap = QPixmap.fromImage(decode_image(path, size, dpr))
+        if size is not None:
+            pixmap.setDevicePixelRatio(dpr)
+        QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+set_budget(DEFAULT_BUDGET_KB)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from math import ceil, sqrt, cos, sin, pi
+from typing import List, Tuple
+
+from PySide6.QtCore import QPointF
+
+GRID = "grid"
+CONCENTRIC = "concentric"
+
+# Slots of the first six tokens around the border of a 120 px box
+BASE_SLOTS = ((0, 0), (50, 0), (100, 0), (100, 50), (100, 100), (50, 100))
+
+
+class SlotAllocator:
+    '''Token slots of a box.
+
+    Slots are handed out and given back in O(1). When the box is full its
+    capacity at least doubles, shrinking the tokens to fit, and it only goes
+    back to the base layout once the box is empty again.
+    '''
+
+    def __init__(self, box_size: int = 120, token_size: int = 50, mode: str = GRID):
+        self.__box_size = box_size
+        self.__token_size = token_size
+        self.__mode = mode
+
+        self.__free: List[int] = []
+        self.__next = 0
+        self.__used = 0
+        self.__capacity = 0
+        self.__positions: List[QPointF] = []
+        self.__scale = 1.0
+        self.__layout(len(BASE_SLOTS))
+
+    def center(self) -> QPointF:
+        '''Top left corner of a full size token in the middle of the box'''
+        return QPointF((self.__box_size - self.__token_size) / 2, (self.__box_size - self.__token_size) / 2)
+
+    def capacity(self) -> int:
+        return self.__capacity
+
+    def scale(self) -> float:
+        '''Scale of the tokens to fit the current capacity'''
+        return self.__scale
+
+    def position(self, slot: int) -> QPointF:
+        '''Top left corner of the token in the slot, in box coordinates'''
+        return self.__positions[slot]
+
+    def assign(self) -> Tuple[int, bool]:
+        '''Returns a free slot and whether the layout changed to make room for it'''
+        grown = False
+        if self.__free:
+            slot = self.__free.pop()
+        else:
+            if self.__next >= self.__capacity:
+                self.__layout(self.__capacity * 2)
+                grown = True
+            slot = self.__next
+            self.__next += 1
+        self.__used += 1
+        return slot, grown
+
+    def release(self, slot: int) -> bool:
+        '''Gives a slot back, returns whether the layout went back to the base one'''
+        self.__used -= 1
+        self.__free.append(slot)
+        shrunk = False
+        if self.__used == 0:
+            self.__free.clear()
+            self.__next = 0
+            if self.__capacity > len(BASE_SLOTS):
+                self.__layout(len(BASE_SLOTS))
+                shrunk = True
+        return shrunk
+
+    def __layout(self, capacity: int):
+        self.__capacity = capacity
+        if capacity <= len(BASE_SLOTS):
+            f = self.__box_size / 120
+            self.__scale = 1.0
+            self.__positions = [QPointF(x * f, y * f) for x, y in BASE_SLOTS]
+        elif self.__mode == CONCENTRIC:
+            self.__concentric(capacity)
+        else:
+            self.__grid(capacity)
+
+    def __grid(self, capacity: int):
+        side = ceil(sqrt(capacity))
+        cell = self.__box_size / side
+        self.__scale = min(1.0, cell / self.__token_size)
+        offset = (cell - self.__token_size * self.__scale) / 2
+        self.__positions = [QPointF((i % side) * cell + offset, (i // side) * cell + offset)
+                            for i in range(capacity)]
+
+    def __concentric(self, capacity: int):
+        # Ring r holds 6r tokens around the one in the middle
+        rings = 0
+        while 1 + 3 * rings * (rings + 1) < capacity:
+            rings += 1
+        step = self.__box_size / (2 * rings + 1)
+        self.__scale = min(1.0, step / self.__token_size)
+        center = (self.__box_size - self.__token_size * self.__scale) / 2
+        self.__positions = [QPointF(center, center)]
+        for ring in range(1, rings + 1):
+            for k in range(6 * ring):
+                angle = 2 * pi * k / (6 * ring)
+                self.__positions.append(QPointF(center + ring * step * cos(angle), center + ring * step * sin(angle)))
@@ -1,11 +1,15 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Iterable, List
 
-from PySide6.QtCore import QSize
-from PySide6.QtGui import QBrush, QPixmap, QColor
+from PySide6.QtCore import QSize, QPointF
+from PySide6.QtGui import QBrush, QColor
 from PySide6.QtWidgets import QGraphicsEllipseItem, QGraphicsItemGroup, QGraphicsPixmapItem
 
+from engine.match import TeamState
+from gameofthegoose.pixmaps import cached_pixmap
+
 if TYPE_CHECKING:
+    from gameofthegoose.animation import Animator
     from gameofthegoose.boxes import Box
 
 
@@ -14,25 +18,30 @@ class Team(QGraphicsItemGroup):
     def __init__(self):
         QGraphicsItemGroup.__init__(self)
 
-        self.skip_turn = False
+        self.__state = TeamState()
 
         self.__box = None
+        self.__animator: Optional[Animator] = None
+        self.__waypoints: List[QPointF] = []
 
-        self.__name = "New team"
-        self.__pixmap = QPixmap()
+        self.__icon: Optional[str] = None
         self.__color = QColor(255, 255, 255)
 
+    def state(self) -> TeamState:
+        return self.__state
+
     def set_name(self, name: str):
-        self.__name = name
+        self.__state.set_name(name)
 
     def name(self):
-        return self.__name
+        return self.__state.name()
 
-    def set_pixmap(self, pixmap: QPixmap):
-        self.__pixmap = pixmap
+    def set_icon(self, path: Optional[str]):
+        '''Image file of the team, decoded at the size it is drawn at'''
+        self.__icon = path
 
-    def pixmap(self) -> QPixmap:
-        return self.__pixmap
+    def icon(self) -> Optional[str]:
+        return self.__icon
 
     def set_color(self, color: QColor):
         self.__color = color
@@ -41,15 +50,8 @@ class Team(QGraphicsItemGroup):
         return self.__color
 
     def init_graphics(self, size):
-        if (self.__pixmap is not None) and (self.__pixmap.size() != QSize(0, 0)):
-            pixmap_item = QGraphicsPixmapItem(self.__pixmap)
-            sx = size / pixmap_item.boundingRect().width()
-            sy = size / pixmap_item.boundingRect().height()
-            if sx < sy:
-                s = sx
-            else:
-                s = sy
-            pixmap_item.setScale(s)
+        if self.__icon is not None:
+            pixmap_item = QGraphicsPixmapItem(cached_pixmap(self.__icon, QSize(size, size)))
             pixmap_item.setZValue(3)
             self.addToGroup(pixmap_item)
         if self.__color is not None:
@@ -59,12 +61,26 @@ class Team(QGraphicsItemGroup):
             color_item.setZValue(2)
             self.addToGroup(color_item)
 
-    def set_box(self, box: Box):
+    def set_animator(self, animator: Optional[Animator]):
+        self.__animator = animator
+
+    def set_box(self, box: Box, waypoints: Iterable[QPointF] = ()):
+        '''Moves the token to the box, going through the waypoints when animated'''
+        self.__waypoints = list(waypoints)
         if self.__box is not None:
             self.__box.release_team_pos(self)
         self.__box = box
         if self.__box is not None:
-            self.setPos(self.__box.assign_team_pos(self))
+            self.__box.assign_team_pos(self)
+
+    def place(self, pos: QPointF, scale: float):
+        self.setScale(scale)
+        if (self.__animator is not None) and (self.scene() is not None):
+            self.__waypoints.append(pos)
+            self.__animator.move(self, self.__waypoints)
+        else:
+            self.setPos(pos)
+        self.__waypoints = []
 
     def box(self) -> Box:
         return self.__box
\ No newline at end of file
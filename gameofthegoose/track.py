@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from math import hypot
+from typing import List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QBrush, QColor, QPainter, QPainterPath, QPainterPathStroker, QPen, QPolygonF
+from PySide6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
+
+# Points whose pieces of track are stroked together
+CHUNK = 64
+
+Chunk = Tuple[QPainterPath, QPainterPath, QRectF]
+
+
+def _mid(a: QPointF, b: QPointF) -> QPointF:
+    return (a + b) / 2
+
+
+class Track(QGraphicsItem):
+    '''Track joining the centers of the boxes, a single item for the whole board.
+
+    The track is cut in pieces, one per point, from the middle of the segment
+    before it to the middle of the segment after it. The pieces are stroked
+    in chunks of CHUNK points and the outlines cached, so painting only fills
+    the chunks in view, and moving a point only strokes its chunks again.
+    In a StaticLayer, invalidate the layer once done changing the track.
+    '''
+
+    def __init__(self, pen: Optional[QPen] = None, curved: bool = False, arrows: bool = False,
+                 parent: Optional[QGraphicsItem] = None):
+        QGraphicsItem.__init__(self, parent)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+
+        if pen is None:
+            pen = QPen(QBrush(QColor(0, 0, 255)), 20, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        self.__pen = pen
+        self.__arrow_brush = QBrush(QColor(255, 255, 255))
+        self.__curved = curved
+        self.__arrows = arrows
+
+        self.__points: List[QPointF] = []
+        self.__chunks: List[Chunk] = []
+        self.__bounds = QRectF()
+
+    def pen(self) -> QPen:
+        return self.__pen
+
+    def points(self) -> List[QPointF]:
+        return self.__points
+
+    def set_style(self, curved: bool, arrows: bool):
+        '''Curved tracks round the turns, arrows show the direction of the path'''
+        self.__curved = curved
+        self.__arrows = arrows
+        self.__stroke(0, len(self.__points))
+
+    def set_points(self, points: Sequence[QPointF]):
+        self.__points = [QPointF(p) for p in points]
+        self.__stroke(0, len(self.__points))
+
+    def append(self, point: QPointF):
+        self.__points.append(QPointF(point))
+        # The piece of the previous last point goes on to the new one
+        self.__stroke(len(self.__points) - 2, len(self.__points))
+
+    def move_point(self, idx: int, point: QPointF):
+        self.__points[idx] = QPointF(point)
+        self.__stroke(idx - 1, idx + 2)
+
+    def boundingRect(self) -> QRectF:
+        return self.__bounds
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = None):
+        exposed = option.exposedRect
+        if painter.hasClipping():
+            exposed = exposed.intersected(painter.clipBoundingRect())
+        painter.setPen(Qt.NoPen)
+        for stroke, arrows, bounds in self.__chunks:
+            if bounds.intersects(exposed):
+                painter.fillPath(stroke, self.__pen.brush())
+                if not arrows.isEmpty():
+                    painter.fillPath(arrows, self.__arrow_brush)
+
+    def __stroke(self, first: int, last: int):
+        '''Strokes again the chunks holding the pieces of the points from first to last, excluded'''
+        count = (len(self.__points) + CHUNK - 1) // CHUNK
+        del self.__chunks[count:]
+        first = max(0, first)
+        last = min(len(self.__points), last)
+        for k in range(first // CHUNK, max(first, last - 1) // CHUNK + 1):
+            if k < count:
+                chunk = self.__chunk(k)
+                if k < len(self.__chunks):
+                    self.__chunks[k] = chunk
+                else:
+                    self.__chunks.append(chunk)
+
+        self.prepareGeometryChange()
+        self.__bounds = QRectF()
+        for _, _, bounds in self.__chunks:
+            self.__bounds = self.__bounds.united(bounds)
+        self.update()
+
+    def __chunk(self, k: int) -> Chunk:
+        points = self.__points
+        last = len(points) - 1
+        start = k * CHUNK
+        path = QPainterPath(points[start] if start == 0 else _mid(points[start - 1], points[start]))
+        arrows = QPainterPath()
+        arrows.setFillRule(Qt.FillRule.WindingFill)
+        for i in range(start, min(start + CHUNK, len(points))):
+            p = points[i]
+            if i == last:
+                path.lineTo(p)
+                break
+            end = _mid(p, points[i + 1])
+            if self.__curved and (i > 0):
+                path.quadTo(p, end)
+            else:
+                path.lineTo(p)
+                path.lineTo(end)
+            if self.__arrows:
+                arrows.addPolygon(self.__arrow(p, points[i + 1], end))
+
+        stroker = QPainterPathStroker(self.__pen)
+        stroke = stroker.createStroke(path)
+        return stroke, arrows, stroke.boundingRect()
+
+    def __arrow(self, a: QPointF, b: QPointF, at: QPointF) -> QPolygonF:
+        length = hypot(b.x() - a.x(), b.y() - a.y())
+        if length == 0:
+            return QPolygonF()
+        size = self.__pen.widthF() * 0.35
+        d = (b - a) / length * size
+        n = QPointF(-d.y(), d.x())
+        return QPolygonF([at + d, at - d + n, at - d - n, at + d])
@@ -0,0 +1,154 @@
+from __future__ import annotations
+from typing import Any, Optional, TYPE_CHECKING
+
+from enum import Enum
+from logging import getLogger
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QDialog
+
+from engine.board import QuizNotFound
+from engine.match import Match, Listener, TeamState
+from engine.rules import Request, Step
+from gameofthegoose.dialogs import DialogPool, RollTheDiceDialog, QuizDialog, ChallengeDialog, SkipTheTurnDialog, \
+    YesDialog, NoDialog, WinnerDialog
+
+if TYPE_CHECKING:
+    from gameofthegoose import Game
+
+logging = getLogger(__name__)
+
+
+def show_dialog(dialog: QDialog):
+    dialog.show()
+    dialog.raise_()
+    dialog.activateWindow()
+
+
+class GameListener(Listener):
+    '''Mirrors the match on the board items and shows the outcome dialogs without blocking'''
+
+    def __init__(self, game: Game, pool: DialogPool):
+        self.__game = game
+        self.__pool = pool
+
+    def team_moved(self, team: TeamState, idx: int):
+        token = self.__game.team(team)
+        boxes = self.__game.boxes()
+        old_idx = token.box().idx
+        step = 1 if idx >= old_idx else -1
+        token.set_box(boxes[idx], [boxes[i].waypoint() for i in range(old_idx + step, idx, step)])
+
+    def turn_skipped(self, team: TeamState):
+        dialog = self.__pool.dialog(SkipTheTurnDialog)
+        dialog.set_team(team)
+        show_dialog(dialog)
+
+    def answered(self, team: TeamState, result: bool):
+        if not result:
+            dialog = self.__pool.dialog(NoDialog)
+        else:
+            dialog = self.__pool.dialog(YesDialog)
+        show_dialog(dialog)
+
+    def winner(self, team: TeamState):
+        dialog = self.__pool.dialog(WinnerDialog)
+        dialog.set_team(team)
+        show_dialog(dialog)
+
+
+class TurnMachine(QObject):
+    '''Plays turns without nested event loops.
+
+    The turn runs until it needs an input, shows the matching dialog
+    modelessly and resumes when the dialog is closed.
+    '''
+
+    class State(Enum):
+        IDLE = 0
+        ROLLING = 1
+        ANSWERING_QUIZ = 2
+        ANSWERING_CHALLENGE = 3
+
+    state_changed = Signal(object)
+    turn_finished = Signal()
+
+    def __init__(self, match: Match, pool: DialogPool, parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        self.__match = match
+        self.__pool = pool
+        self.__steps: Optional[Step] = None
+        self.__state = TurnMachine.State.IDLE
+
+        self.__pool.dialog(RollTheDiceDialog).finished.connect(self.__on_roll_finished)
+        self.__pool.dialog(QuizDialog).finished.connect(self.__on_quiz_finished)
+        self.__pool.dialog(ChallengeDialog).finished.connect(self.__on_challenge_finished)
+
+    def state(self) -> TurnMachine.State:
+        return self.__state
+
+    def start(self) -> bool:
+        '''Starts the turn of the current team, unless a turn is already running'''
+        ret = False
+        if self.__state == TurnMachine.State.IDLE:
+            self.__steps = self.__match.steps()
+            self.__resume(None)
+            ret = True
+        return ret
+
+    def provide(self, value: Any):
+        '''Answers the request the turn is waiting for'''
+        if self.__state != TurnMachine.State.IDLE:
+            self.__resume(value)
+
+    def __resume(self, value: Any):
+        try:
+            if value is None:
+                request = next(self.__steps)
+            else:
+                request = self.__steps.send(value)
+        except StopIteration:
+            self.__steps = None
+            self.__set_state(TurnMachine.State.IDLE)
+            self.turn_finished.emit()
+        else:
+            self.__request(request)
+
+    def __request(self, request: Request):
+        dialog = None
+        if request.kind == Request.Kind.ROLL:
+            dialog = self.__pool.dialog(RollTheDiceDialog)
+            dialog.set_team(request.team)
+            self.__set_state(TurnMachine.State.ROLLING)
+        elif request.kind == Request.Kind.QUIZ:
+            try:
+                self.__pool.dialog(QuizDialog).set_quiz(request.subject)
+            except QuizNotFound as e:
+                # The team is not sent back for a question that cannot be asked
+                logging.warning("Skipping quiz: %s", e)
+                self.__resume(True)
+            else:
+                dialog = self.__pool.dialog(QuizDialog)
+                self.__set_state(TurnMachine.State.ANSWERING_QUIZ)
+        else:
+            dialog = self.__pool.dialog(ChallengeDialog)
+            dialog.set_challenge(request.subject)
+            self.__set_state(TurnMachine.State.ANSWERING_CHALLENGE)
+        if dialog is not None:
+            show_dialog(dialog)
+
+    def __set_state(self, state: TurnMachine.State):
+        self.__state = state
+        self.state_changed.emit(state)
+
+    def __on_roll_finished(self):
+        if self.__state == TurnMachine.State.ROLLING:
+            self.provide(self.__pool.dialog(RollTheDiceDialog).dice_value())
+
+    def __on_quiz_finished(self):
+        if self.__state == TurnMachine.State.ANSWERING_QUIZ:
+            self.provide(self.__pool.dialog(QuizDialog).quiz_result())
+
+    def __on_challenge_finished(self):
+        if self.__state == TurnMachine.State.ANSWERING_CHALLENGE:
+            self.provide(self.__pool.dialog(ChallengeDialog).challenge_result())
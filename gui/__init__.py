@@ -1 +1,2 @@
 from gui.mainwindow import MainWindow
+from gui.spectatorwindow import SpectatorWindow
@@ -1,42 +1,54 @@
-from PySide6.QtCore import QDir, Qt, QSize
-from PySide6.QtGui import QPixmap
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import QDir, QSize
+from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QDialog, QPushButton, QSizePolicy
 
+from gui.thumbnails import thumbnails
 from gui.ui_icondialog import Ui_IconDialog
 
+ICON_SIZE = QSize(50, 50)
+COLUMNS = 4
+
 
 class IconDialog(QDialog, Ui_IconDialog):
+    '''Grid of the team icons, filled as their thumbnails are decoded'''
 
-    def __init__(self):
+    def __init__(self, dir_path: str = ":images/teams/"):
         QDialog.__init__(self)
         self.setupUi(self)
 
         self.setWindowTitle("Select icon")
 
-        self.__current_pixmap = QPixmap()
+        self.__current_icon: Optional[str] = None
+        self.__buttons: Dict[str, QPushButton] = {}
 
-        dir_path = ":images/teams/"
-        dir_obj = QDir(dir_path)
-        icons_path = dir_obj.entryList()
+        loader = thumbnails()
+        loader.ready.connect(self.__on_thumbnail_ready)
 
-        r = 0
-        c = 0
-        for icon_path in icons_path:
+        icons_path: List[str] = QDir(dir_path).entryList()
+        for i, icon_path in enumerate(icons_path):
+            path = dir_path + icon_path
             button = QPushButton()
             button.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-            button.pixmap = QPixmap(dir_path + icon_path)
-            button.setIcon(button.pixmap)
-            button.setIconSize(QSize(50, 50))
+            button.setIconSize(ICON_SIZE)
+            button.setProperty("icon_path", path)
             button.clicked.connect(self.__button_clicked)
-            self.gridLayout.addWidget(button, r, c)
-            c += 1
-            if c > 3:
-                r += 1
-                c = 0
+            self.__buttons[path] = button
+            self.gridLayout.addWidget(button, i // COLUMNS, i % COLUMNS)
+
+            thumbnail = loader.thumbnail(path, ICON_SIZE)
+            if thumbnail is not None:
+                button.setIcon(QIcon(thumbnail))
+
+    def __on_thumbnail_ready(self, path: str, size: QSize):
+        button = self.__buttons.get(path)
+        if (button is not None) and (size == ICON_SIZE):
+            button.setIcon(QIcon(thumbnails().thumbnail(path, ICON_SIZE)))
 
     def __button_clicked(self):
         button: QPushButton = self.sender()
-        self.__current_pixmap = button.pixmap
+        self.__current_icon = button.property("icon_path")
 
-    def current_pixmap(self) -> QPixmap:
-        return self.__current_pixmap
+    def current_icon(self) -> Optional[str]:
+        return self.__current_icon
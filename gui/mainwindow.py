@@ -1,15 +1,27 @@
+import os
+from typing import Optional
+from logging import getLogger
+
+from PySide6.QtGui import QCloseEvent, QColor, QResizeEvent
 from PySide6.QtWidgets import QMainWindow, QApplication, QGraphicsScene
 
-from gameofthegoose import Game
+from engine import EventLog, read_log
+from gameofthegoose import Game, Team
+from network.broadcast import Broadcaster, Publisher
 
 from gui.controllerdialog import ControllerDialog
+from gui.navigation import BoardNavigator
+from gui.startup import StartupProfiler
 from gui.teamdialog import TeamDialog
 from gui.ui_mainwindow import Ui_MainWindow
 
+logging = getLogger(__name__)
+
 
 class MainWindow(QMainWindow, Ui_MainWindow):
 
-    def __init__(self, parent=None):
+    def __init__(self, log_filename: Optional[str] = None, recover: bool = False,
+                 broadcast_port: Optional[int] = None, profiler: Optional[StartupProfiler] = None, parent=None):
         QMainWindow.__init__(self)
         self.setupUi(self)
 
@@ -17,25 +29,100 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                             " - " +
                             QApplication.instance().applicationVersion())
 
+        if profiler is None:
+            profiler = StartupProfiler()
+
         self.__game = Game()
-        self.__game.load("game.xml")
+        with profiler.phase("game_load"):
+            self.__game.load("game.xml")
+
+        self.__log: Optional[EventLog] = None
+        if log_filename is not None:
+            self.__log = EventLog(log_filename)
+
+        recovered = False
+        if recover and self.__log is not None and os.path.exists(log_filename):
+            recovered = self.__recover(log_filename)
+            if not recovered:
+                # Starting the new log would truncate the only copy of the crashed match
+                backup = log_filename + ".bak"
+                os.replace(log_filename, backup)
+                logging.warning("Starting a new match, the old log is kept in %s", backup)
+                # The teams and the turns replayed so far go with the old game
+                self.__game = Game()
+                with profiler.phase("game_load"):
+                    self.__game.load("game.xml")
+
+        if not recovered:
+            with profiler.phase("team_dialog", interactive=True):
+                team_dialog = TeamDialog()
+                team_dialog.exec_()
+                teams = team_dialog.get_teams()
 
-        team_dialog = TeamDialog()
-        team_dialog.exec_()
-        teams = team_dialog.get_teams()
+            for team in teams:
+                self.__game.add_team(team)
 
-        for team in teams:
-            self.__game.add_team(team)
+            if self.__log is not None:
+                self.__log.start([team.state() for team in teams],
+                                 [team.color().rgba() for team in teams],
+                                 [team.icon() for team in teams])
+
+        if self.__log is not None:
+            self.__game.match().add_listener(self.__log)
+
+        self.__publisher: Optional[Publisher] = None
+        if broadcast_port is not None:
+            self.__publisher = Publisher()
+            match = self.__game.match()
+            colors = [self.__game.team(state).color().rgba() for state in match.teams()]
+            match.add_listener(Broadcaster(self.__publisher, match, colors))
+            self.__publisher.start("0.0.0.0", broadcast_port)
 
         self.__controller_dialog = ControllerDialog()
         self.__controller_dialog.clicked.connect(self.__click)
         self.__controller_dialog.show()
 
         self.__scene = QGraphicsScene()
+        # Only a few tokens move over the static layer, an index would just be rebuilt as they move
+        self.__scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
         self.graphicsView.setScene(self.__scene)
+        self.__navigator = BoardNavigator(self.graphicsView)
+
+        with profiler.phase("init_graphics"):
+            self.__game.init_graphics(QApplication.primaryScreen().availableSize())
+        with profiler.phase("scene_insertion"):
+            self.__scene.addItem(self.__game)
+
+        with profiler.phase("dialogs_preload"):
+            self.__game.dialogs().preload()
+
+    def __recover(self, log_filename: str) -> bool:
+        '''Adds the teams of the log to the game and replays it, False if the log does not fit the game'''
+        ret = False
+        try:
+            contents = read_log(log_filename)
+            for name, color, icon in zip(contents.teams, contents.colors, contents.icons):
+                team = Team()
+                team.set_name(name)
+                team.set_color(QColor.fromRgba(color))
+                team.set_icon(icon)
+                self.__game.add_team(team)
+            self.__log.recover(self.__game.match(), contents)
+            ret = True
+        except (OSError, ValueError) as e:
+            logging.warning("Cannot recover the match from %s: %s", log_filename, e)
+        return ret
+
+    def resizeEvent(self, event: QResizeEvent):
+        QMainWindow.resizeEvent(self, event)
+        self.__navigator.resized()
 
-        self.__game.init_graphics()
-        self.__scene.addItem(self.__game)
+    def closeEvent(self, event: QCloseEvent):
+        if self.__log is not None:
+            self.__log.close()
+        if self.__publisher is not None:
+            self.__publisher.stop()
+        QMainWindow.closeEvent(self, event)
 
     def __click(self):
         self.__game.next()
@@ -0,0 +1,109 @@
+from typing import Optional
+
+from PySide6.QtCore import QEasingCurve, QEvent, QObject, QPointF, QRectF, QVariantAnimation, Qt
+from PySide6.QtGui import QPainter
+from PySide6.QtWidgets import QGraphicsView
+
+# Zoom factor of a wheel notch
+ZOOM_STEP = 1.25
+
+# Largest zoom, in view pixels per scene unit
+MAX_SCALE = 4.0
+
+
+class BoardNavigator(QObject):
+    '''Smooth wheel zoom under the cursor and drag panning of the board view.
+
+    The board fits the view until the user zooms in, and again once zoomed
+    back out or on a double click. Zooming never goes below the fitting
+    scale, so the view never shows more than the board.
+    '''
+
+    def __init__(self, view: QGraphicsView, duration: int = 150, parent: Optional[QObject] = None):
+        QObject.__init__(self, parent if parent is not None else view)
+
+        self.__view = view
+        self.__fitted = True
+        self.__target = 0.0
+        # View position and the scene position kept under it while zooming
+        self.__anchor = QPointF()
+        self.__scene_anchor = QPointF()
+
+        view.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        view.setTransformationAnchor(QGraphicsView.ViewportAnchor.NoAnchor)
+        view.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        # Every item of the board sets the pen, brush and hints it paints with
+        view.setOptimizationFlags(QGraphicsView.OptimizationFlag.DontSavePainterState |
+                                  QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing)
+        view.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        view.viewport().installEventFilter(self)
+
+        self.__animation = QVariantAnimation(self)
+        self.__animation.setDuration(duration)
+        self.__animation.setEasingCurve(QEasingCurve.Type.OutCubic)
+        self.__animation.valueChanged.connect(self.__zoom_to)
+
+    def scale(self) -> float:
+        return self.__view.transform().m11()
+
+    def fitted(self) -> bool:
+        return self.__fitted
+
+    def fit(self):
+        self.__animation.stop()
+        self.__view.fitInView(self.__board(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.__fitted = True
+
+    def resized(self):
+        '''Call from the resize event of the window'''
+        if self.__fitted:
+            self.fit()
+
+    def zoom(self, steps: float, anchor: Optional[QPointF] = None):
+        '''Zooms in by steps wheel notches, out when negative, keeping the board still under anchor'''
+        self.__anchor = anchor if anchor is not None else QPointF(self.__view.viewport().rect().center())
+        self.__scene_anchor = self.__view.mapToScene(self.__anchor.toPoint())
+        running = self.__animation.state() == QVariantAnimation.State.Running
+        target = (self.__target if running else self.scale()) * ZOOM_STEP ** steps
+        target = min(MAX_SCALE, max(self.__fit_scale(), target))
+        if target == self.scale():
+            return
+        self.__target = target
+        self.__animation.stop()
+        self.__animation.setStartValue(self.scale())
+        self.__animation.setEndValue(target)
+        self.__animation.start()
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        ret = False
+        if event.type() == QEvent.Type.Wheel:
+            self.zoom(event.angleDelta().y() / 120, event.position())
+            ret = True
+        elif event.type() == QEvent.Type.MouseButtonDblClick:
+            self.fit()
+            ret = True
+        return ret
+
+    def __board(self) -> QRectF:
+        scene = self.__view.scene()
+        return scene.itemsBoundingRect() if scene is not None else QRectF()
+
+    def __fit_scale(self) -> float:
+        board = self.__board()
+        viewport = self.__view.viewport().rect()
+        if board.isEmpty() or viewport.isEmpty():
+            return self.scale()
+        # fitInView() keeps a margin of 2 pixels on each side
+        return min((viewport.width() - 4) / board.width(), (viewport.height() - 4) / board.height())
+
+    def __zoom_to(self, value: float):
+        if value <= self.__fit_scale():
+            self.fit()
+        else:
+            view = self.__view
+            factor = value / self.scale()
+            view.scale(factor, factor)
+            offset = self.__anchor - QPointF(view.viewport().rect().center())
+            view.centerOn(self.__scene_anchor - offset / value)
+            self.__fitted = False
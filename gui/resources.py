@@ -0,0 +1,52 @@
+import os
+import shutil
+import subprocess
+from logging import getLogger
+
+from PySide6.QtCore import QResource
+
+logging = getLogger(__name__)
+
+RESOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+QRC_FILE = os.path.join(RESOURCE_DIR, "resources.qrc")
+RCC_FILE = os.path.join(RESOURCE_DIR, "resources.rcc")
+
+
+def is_outdated(rcc_file: str = RCC_FILE, qrc_file: str = QRC_FILE) -> bool:
+    '''Whether the bundle is missing or older than the resource list or any image'''
+    ret = True
+    if os.path.exists(rcc_file):
+        built = os.path.getmtime(rcc_file)
+        ret = os.path.getmtime(qrc_file) > built
+        for root, _, files in os.walk(os.path.join(os.path.dirname(qrc_file), "images")):
+            ret = ret or any(os.path.getmtime(os.path.join(root, file)) > built for file in files)
+    return ret
+
+
+def build_resources(rcc_file: str = RCC_FILE, qrc_file: str = QRC_FILE) -> bool:
+    '''Compiles the resource list into a binary bundle with pyside6-rcc'''
+    ret = False
+    rcc = shutil.which("pyside6-rcc")
+    if rcc is None:
+        logging.warning("pyside6-rcc not found, cannot build %s", rcc_file)
+    else:
+        result = subprocess.run([rcc, "--binary", qrc_file, "-o", rcc_file], capture_output=True, text=True)
+        if result.returncode != 0:
+            logging.warning("Cannot build %s: %s", rcc_file, result.stderr.strip())
+        else:
+            ret = True
+    return ret
+
+
+def register_resources(rcc_file: str = RCC_FILE) -> bool:
+    '''Makes the ":/images/..." paths available from the binary bundle.
+
+    Qt memory maps the bundle, so the artwork is only read when an image is
+    decoded. The bundle is rebuilt first when the images changed.
+    '''
+    if (rcc_file == RCC_FILE) and is_outdated():
+        build_resources()
+    ret = QResource.registerResource(rcc_file)
+    if not ret:
+        logging.error("Cannot register resources from %s", rcc_file)
+    return ret
@@ -0,0 +1,116 @@
+from typing import Optional
+
+from PySide6.QtGui import QColor, QResizeEvent
+from PySide6.QtNetwork import QAbstractSocket, QTcpSocket
+from PySide6.QtWidgets import QMainWindow, QApplication, QGraphicsScene
+
+from engine.quizbank import open_bank
+from engine.rules import Request
+from gameofthegoose import Game, Team
+from gameofthegoose.dialogs import RollTheDiceDialog, QuizDialog, ChallengeDialog
+from gameofthegoose.turns import show_dialog
+from network.broadcast import BoardState
+from network.protocol import SNAPSHOT, MOVED, SKIP, REQUESTED, ANSWERED, SKIPPED, WINNER, FrameReader
+
+from gui.navigation import BoardNavigator
+from gui.ui_mainwindow import Ui_MainWindow
+
+
+class SpectatorWindow(QMainWindow, Ui_MainWindow):
+    '''Read-only view of a match broadcast by another window.
+
+    The board is drawn locally from the same board file, only the deltas of
+    the match go through the network.
+    '''
+
+    def __init__(self, host: str, port: int, board_filename: str = "game.xml", parent=None):
+        QMainWindow.__init__(self)
+        self.setupUi(self)
+
+        self.setWindowTitle(QApplication.instance().applicationName() + " - " + host)
+
+        self.__board_filename = board_filename
+        self.__game: Optional[Game] = None
+        self.__state = BoardState()
+        self.__frames = FrameReader()
+
+        self.__scene = QGraphicsScene()
+        self.__scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        self.graphicsView.setScene(self.__scene)
+        self.__navigator = BoardNavigator(self.graphicsView)
+
+        self.__socket = QTcpSocket(self)
+        self.__socket.setSocketOption(QAbstractSocket.SocketOption.LowDelayOption, 1)
+        self.__socket.readyRead.connect(self.__read)
+        self.__socket.connectToHost(host, port)
+
+    def resizeEvent(self, event: QResizeEvent):
+        QMainWindow.resizeEvent(self, event)
+        self.__navigator.resized()
+
+    def __read(self):
+        for kind, payload in self.__frames.feed(self.__socket.readAll().data()):
+            self.__state.apply(kind, payload)
+            if kind == SNAPSHOT:
+                self.__build()
+            elif self.__game is not None:
+                self.__update(kind, payload)
+
+    def __build(self):
+        state = self.__state
+        self.__scene.clear()
+        self.__game = Game()
+        self.__game.load(self.__board_filename)
+        for i, name in enumerate(state.names):
+            team = Team()
+            team.set_name(name)
+            team.set_color(QColor.fromRgba(state.colors[i]))
+            team.state().idx = state.positions[i]
+            team.state().skip_turn = state.skips[i]
+            self.__game.add_team(team)
+
+        self.__game.init_graphics(QApplication.primaryScreen().availableSize())
+        self.__scene.addItem(self.__game)
+        self.__navigator.fit()
+        self.__show_request()
+
+    def __update(self, kind: int, payload: bytes):
+        teams = self.__game.match().teams()
+        listener = self.__game.match().listener()
+        if kind == MOVED:
+            team = teams[payload[0]]
+            team.idx = self.__state.positions[payload[0]]
+            listener.team_moved(team, team.idx)
+        elif kind == SKIP:
+            teams[payload[0]].skip_turn = self.__state.skips[payload[0]]
+        elif kind == REQUESTED:
+            self.__show_request()
+        elif kind == ANSWERED:
+            listener.answered(teams[payload[0]], bool(payload[1]))
+        elif kind == SKIPPED:
+            listener.turn_skipped(teams[payload[0]])
+        elif kind == WINNER:
+            listener.winner(teams[payload[0]])
+
+    def __show_request(self):
+        dialogs = self.__game.dialogs()
+        for dialog_class in (RollTheDiceDialog, QuizDialog, ChallengeDialog):
+            dialogs.dialog(dialog_class).hide()
+
+        pending = self.__state.pending
+        if pending is not None:
+            team = self.__game.match().teams()[self.__state.pending_team]
+            rule = self.__game.board().boxes()[team.idx]
+            if pending == Request.Kind.ROLL:
+                dialog = dialogs.dialog(RollTheDiceDialog)
+                dialog.set_team(team)
+            elif pending == Request.Kind.QUIZ:
+                dialog = dialogs.dialog(QuizDialog)
+                if self.__state.pending_subject >= 0:
+                    dialog.set_quiz(open_bank(self.__game.board().bank_filename()).quiz(self.__state.pending_subject))
+                else:
+                    dialog.set_quiz(rule.quiz())
+            else:
+                dialog = dialogs.dialog(ChallengeDialog)
+                dialog.set_challenge(rule.challenge())
+            show_dialog(dialog)
@@ -0,0 +1,105 @@
+import cProfile
+import json
+import platform
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from logging import getLogger
+
+from PySide6.QtCore import QEvent, QObject, QTimer, qVersion
+from PySide6.QtWidgets import QApplication, QWidget
+
+logging = getLogger(__name__)
+
+
+class StartupProfiler(QObject):
+    '''Times the phases of the startup, up to the first paint of the board.
+
+    A disabled profiler only costs a function call per phase, so the phases
+    can stay in the code.
+    '''
+
+    def __init__(self, enabled: bool = False, report_filename: Optional[str] = None,
+                 cprofile_filename: Optional[str] = None, start: Optional[float] = None):
+        QObject.__init__(self)
+
+        self.__enabled = enabled
+        self.__report_filename = report_filename
+        self.__cprofile_filename = cprofile_filename
+        self.__start = start if start is not None else time.perf_counter()
+        self.__phases: List[Dict[str, Any]] = []
+        self.__painted: Optional[QWidget] = None
+        self.__shown = 0.0
+
+        self.__profile: Optional[cProfile.Profile] = None
+        if enabled and cprofile_filename is not None:
+            self.__profile = cProfile.Profile()
+            self.__profile.enable()
+
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    def phases(self) -> List[Dict[str, Any]]:
+        return self.__phases
+
+    @contextmanager
+    def phase(self, name: str, interactive: bool = False):
+        '''Times a phase; interactive phases wait for the user and are left out of the total'''
+        if not self.__enabled:
+            yield
+        else:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.add_phase(name, start, time.perf_counter(), interactive)
+
+    def add_phase(self, name: str, start: float, end: float, interactive: bool = False):
+        if self.__enabled:
+            self.__phases.append({"name": name,
+                                  "start_ms": round((start - self.__start) * 1000, 3),
+                                  "duration_ms": round((end - start) * 1000, 3),
+                                  "interactive": interactive})
+
+    def watch_first_paint(self, widget: QWidget):
+        '''Ends the profile once the widget, shown from now on, has been painted'''
+        if self.__enabled:
+            self.__shown = time.perf_counter()
+            self.__painted = widget
+            widget.installEventFilter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if (watched is self.__painted) and (event.type() == QEvent.Type.Paint):
+            self.__painted.removeEventFilter(self)
+            self.__painted = None
+            # Runs once the paint event has been handled
+            QTimer.singleShot(0, self.__first_paint)
+        return False
+
+    def report(self) -> Dict[str, Any]:
+        return {"python": platform.python_version(),
+                "qt": qVersion(),
+                "platform": platform.platform(),
+                "application": QApplication.applicationVersion(),
+                "phases": self.__phases,
+                "total_ms": round(sum(p["duration_ms"] for p in self.__phases if not p["interactive"]), 3)}
+
+    def finish(self):
+        if self.__profile is not None:
+            self.__profile.disable()
+            self.__profile.dump_stats(self.__cprofile_filename)
+            self.__profile = None
+            logging.info("Startup profile written to %s", self.__cprofile_filename)
+
+        report = self.report()
+        for p in report["phases"]:
+            logging.info("Startup %-20s %10.1f ms%s", p["name"], p["duration_ms"],
+                         " (interactive)" if p["interactive"] else "")
+        logging.info("Startup total %.1f ms", report["total_ms"])
+        if self.__report_filename is not None:
+            with open(self.__report_filename, "w") as file:
+                json.dump(report, file, indent=2)
+
+    def __first_paint(self):
+        self.add_phase("first_paint", self.__shown, time.perf_counter())
+        self.finish()
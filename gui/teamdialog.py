@@ -1,11 +1,12 @@
 from typing import Optional, Union, Any, List
 
-from PySide6.QtCore import QAbstractTableModel, QModelIndex, QPersistentModelIndex, Qt, QObject
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QPersistentModelIndex, Qt, QObject, QSize
 from PySide6.QtGui import QAction, QBrush
 from PySide6.QtWidgets import QDialog, QStyledItemDelegate, QWidget, QStyleOptionViewItem, QColorDialog
 
 from gameofthegoose.teams import Team
-from gui.icondialog import IconDialog
+from gui.icondialog import IconDialog, ICON_SIZE
+from gui.thumbnails import thumbnails
 from gui.ui_teamdialog import Ui_TeamDialog
 
 
@@ -17,6 +18,8 @@ class TeamTableModel(QAbstractTableModel):
         self.__headers = ["Name", "Color", "Icon"]
         self.__teams: Optional[List[Team]] = None
 
+        thumbnails().ready.connect(self.__on_thumbnail_ready)
+
     def set_source(self, teams: List[Team]):
         self.__teams = teams
 
@@ -60,8 +63,8 @@ class TeamTableModel(QAbstractTableModel):
         if role == Qt.ItemDataRole.DecorationRole:
             row = index.row()
             col = index.column()
-            if col == 2:
-                ret = self.__teams[row].pixmap()
+            if (col == 2) and (self.__teams[row].icon() is not None):
+                ret = thumbnails().thumbnail(self.__teams[row].icon(), ICON_SIZE)
         return ret
 
     def setData(self, index: Union[QModelIndex, QPersistentModelIndex], value: Any, role: int = Qt.ItemDataRole.EditRole) -> bool:
@@ -73,9 +76,16 @@ class TeamTableModel(QAbstractTableModel):
             if col == 1:
                 self.__teams[row].set_color(value)
             if col == 2:
-                self.__teams[row].set_pixmap(value)
+                self.__teams[row].set_icon(value)
         return True
 
+    def __on_thumbnail_ready(self, path: str, size: QSize):
+        if (self.__teams is not None) and (size == ICON_SIZE):
+            for row, team in enumerate(self.__teams):
+                if team.icon() == path:
+                    index = self.index(row, 2)
+                    self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
     def insertRows(self, row: int, count: int, parent: Union[QModelIndex, QPersistentModelIndex] = ...) -> bool:
         self.beginInsertRows(QModelIndex(), row, row + count - 1)
         self.__teams.insert(row, Team())
@@ -128,8 +138,9 @@ class TeamDialog(QDialog, Ui_TeamDialog):
         if col == 2:
             dialog = IconDialog()
             dialog.exec_()
-            self.tableView.model().setData(index, dialog.current_pixmap())
-            self.tableView.resizeRowToContents(index.row())
+            if dialog.current_icon() is not None:
+                self.tableView.model().setData(index, dialog.current_icon())
+                self.tableView.resizeRowToContents(index.row())
 
     def get_teams(self) -> List[Team]:
         return self.__teams
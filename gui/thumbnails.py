@@ -0,0 +1,74 @@
+from typing import Optional, Set, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QSize, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPixmap, QPixmapCache
+
+from gameofthegoose.pixmaps import decode_image, device_pixel_ratio, pixmap_key
+
+Key = Tuple[str, int, int]
+
+
+class _Decoded(QObject):
+    decoded = Signal(str, QSize, QImage)
+
+
+class _DecodeTask(QRunnable):
+
+    def __init__(self, path: str, size: QSize, dpr: float, decoded: _Decoded):
+        QRunnable.__init__(self)
+        self.__path = path
+        self.__size = size
+        self.__dpr = dpr
+        self.__decoded = decoded
+
+    def run(self):
+        self.__decoded.decoded.emit(self.__path, self.__size, decode_image(self.__path, self.__size, self.__dpr))
+
+
+class ThumbnailLoader(QObject):
+    '''Decodes downsampled icons on a thread pool.
+
+    Thumbnails go to the pixmap cache under the same keys as cached_pixmap(),
+    so every view asking for the same icon at the same size shares them.
+    '''
+
+    ready = Signal(str, QSize)
+
+    def __init__(self, pool: Optional[QThreadPool] = None, parent: Optional[QObject] = None):
+        QObject.__init__(self, parent)
+
+        self.__pool = pool if pool is not None else QThreadPool.globalInstance()
+        self.__pending: Set[Key] = set()
+        # Emitted from the pool threads, delivered on the thread of the loader
+        self.__decoded = _Decoded(self)
+        self.__decoded.decoded.connect(self.__on_decoded)
+
+    def thumbnail(self, path: str, size: QSize) -> Optional[QPixmap]:
+        '''Cached thumbnail, or None while it is decoded; ready is emitted once it is available'''
+        dpr = device_pixel_ratio()
+        ret = QPixmapCache.find(pixmap_key(path, size, dpr))
+        if ret is None:
+            key = (path, size.width(), size.height())
+            if key not in self.__pending:
+                self.__pending.add(key)
+                self.__pool.start(_DecodeTask(path, QSize(size), dpr, self.__decoded))
+        return ret
+
+    def __on_decoded(self, path: str, size: QSize, image: QImage):
+        self.__pending.discard((path, size.width(), size.height()))
+        dpr = device_pixel_ratio()
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        QPixmapCache.insert(pixmap_key(path, size, dpr), pixmap)
+        self.ready.emit(path, size)
+
+
+_loader: Optional[ThumbnailLoader] = None
+
+
+def thumbnails() -> ThumbnailLoader:
+    '''Loader shared by all the views'''
+    global _loader
+    if _loader is None:
+        _loader = ThumbnailLoader()
+    return _loader
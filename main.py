@@ -1,22 +1,51 @@
+import time
+
+START = time.perf_counter()
+
+import argparse
 import logging
 import sys
 
 from PySide6.QtWidgets import QApplication
 
-import gui.rc_resources
-from gui import MainWindow
+from gui import MainWindow, SpectatorWindow
+from gui.resources import register_resources
+from gui.startup import StartupProfiler
+
+IMPORTED = time.perf_counter()
 
 '''Application entry point'''
 if __name__ == "__main__":
 
     logging.basicConfig(format='%(asctime)s %(threadName)s %(module)s: %(message)s', level=logging.DEBUG)
 
-    app = QApplication(sys.argv)
-    app.setOrganizationName("La MULA")
-    app.setApplicationName("Gioco dell'oca")
-    app.setApplicationVersion("0.0.1")
-    main_window = MainWindow()
+    parser = argparse.ArgumentParser(description="Game of the goose")
+    parser.add_argument("--log", default="game.log", help="file recording the match inputs")
+    parser.add_argument("--recover", action="store_true", help="resume the match recorded in the log")
+    parser.add_argument("--broadcast", type=int, metavar="PORT", help="stream the match to spectator windows")
+    parser.add_argument("--spectate", metavar="HOST:PORT", help="show a match broadcast by another window")
+    parser.add_argument("--profile-startup", nargs="?", const="startup.json", metavar="REPORT",
+                        help="time the startup phases and write a JSON report (default: startup.json)")
+    parser.add_argument("--cprofile", metavar="FILE", help="with --profile-startup, also dump cProfile stats")
+    args, qt_args = parser.parse_known_args()
+
+    profiler = StartupProfiler(args.profile_startup is not None, args.profile_startup, args.cprofile, START)
+    profiler.add_phase("imports", START, IMPORTED)
+
+    with profiler.phase("qapplication"):
+        app = QApplication(sys.argv[:1] + qt_args)
+        app.setOrganizationName("La MULA")
+        app.setApplicationName("Gioco dell'oca")
+        app.setApplicationVersion("0.0.1")
+    with profiler.phase("resources"):
+        register_resources()
+    if args.spectate is not None:
+        host, _, port = args.spectate.rpartition(":")
+        main_window = SpectatorWindow(host, int(port))
+    else:
+        main_window = MainWindow(args.log, args.recover, args.broadcast, profiler)
 
+    profiler.watch_first_paint(main_window.graphicsView.viewport())
     main_window.showMaximized()
 
     app.exec()
@@ -0,0 +1,5 @@
+from network.protocol import ProtocolError, SessionState
+from network.session import Session, Subscriber
+from network.server import GameServer
+from network.client import Controller
+from network.broadcast import BoardState, Publisher, Broadcaster
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import asyncio
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from logging import getLogger
+
+from engine.match import Listener, Match, TeamState
+from engine.quizbank import BankQuiz
+from engine.rules import Request
+from network.protocol import SNAPSHOT, MOVED, SKIP, REQUESTED, ANSWERED, SKIPPED, WINNER, TURN, NOBODY, \
+    ProtocolError, frame, split_frames, pending_code, pending_kind
+
+logging = getLogger(__name__)
+
+_SNAPSHOT = struct.Struct("<IBBBiBB")
+_TEAM = struct.Struct("<HBIB")
+_MOVED = struct.Struct("<BH")
+_PAIR = struct.Struct("<BB")
+_REQUESTED = struct.Struct("<BBi")
+_TEAM_IDX = struct.Struct("<B")
+_TURN = struct.Struct("<IB")
+
+
+class BoardState:
+    '''What a spectator needs to show a match, kept up to date by applying the deltas'''
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.colors: List[int] = []
+        self.positions: List[int] = []
+        self.skips: List[bool] = []
+        self.turn = 0
+        self.team = 0
+        self.pending: Optional[Request.Kind] = None
+        self.pending_team = 0
+        # Position of the pending quiz in the quiz bank, -1 when not drawn from a bank
+        self.pending_subject = -1
+        self.winner: Optional[int] = None
+
+    def encode(self) -> bytes:
+        winner = NOBODY if self.winner is None else self.winner
+        ret = bytearray(_SNAPSHOT.pack(self.turn, self.team, pending_code(self.pending), self.pending_team,
+                                       self.pending_subject, winner, len(self.names)))
+        for name, color, idx, skip in zip(self.names, self.colors, self.positions, self.skips):
+            name = name.encode("utf-8")[:255]
+            ret += _TEAM.pack(idx, skip, color, len(name)) + name
+        return bytes(ret)
+
+    def apply(self, kind: int, payload: bytes):
+        if kind == SNAPSHOT:
+            self.__decode(payload)
+        elif kind == MOVED:
+            team, idx = _MOVED.unpack(payload)
+            self.positions[team] = idx
+        elif kind == SKIP:
+            team, skip = _PAIR.unpack(payload)
+            self.skips[team] = bool(skip)
+        elif kind == REQUESTED:
+            code, self.pending_team, self.pending_subject = _REQUESTED.unpack(payload)
+            self.pending = pending_kind(code)
+        elif kind == WINNER:
+            # Teams still reach the finish after the first one
+            if self.winner is None:
+                self.winner, = _TEAM_IDX.unpack(payload)
+        elif kind == TURN:
+            self.turn, self.team = _TURN.unpack(payload)
+        elif kind not in (ANSWERED, SKIPPED):
+            raise ProtocolError("Unknown delta {}".format(kind))
+
+    def __decode(self, payload: bytes):
+        self.turn, self.team, pending, self.pending_team, self.pending_subject, winner, count = \
+            _SNAPSHOT.unpack_from(payload, 0)
+        self.pending = pending_kind(pending)
+        self.winner = None if winner == NOBODY else winner
+        self.names, self.colors, self.positions, self.skips = [], [], [], []
+        pos = _SNAPSHOT.size
+        for _ in range(count):
+            idx, skip, color, length = _TEAM.unpack_from(payload, pos)
+            pos += _TEAM.size
+            self.names.append(bytes(payload[pos:pos + length]).decode("utf-8"))
+            pos += length
+            self.colors.append(color)
+            self.positions.append(idx)
+            self.skips.append(bool(skip))
+
+
+def encode_moved(team: int, idx: int) -> bytes:
+    return frame(MOVED, _MOVED.pack(team, idx))
+
+
+def encode_pair(kind: int, first: int, second: int) -> bytes:
+    return frame(kind, _PAIR.pack(first, second))
+
+
+def encode_requested(kind: Optional[Request.Kind], team: int, subject: int = -1) -> bytes:
+    return frame(REQUESTED, _REQUESTED.pack(pending_code(kind), team, subject))
+
+
+def encode_team(kind: int, team: int) -> bytes:
+    return frame(kind, _TEAM_IDX.pack(team))
+
+
+class Publisher:
+    '''Streams the deltas of a match to any number of spectators.
+
+    publish() only appends to a journal and wakes the network thread, so it
+    costs the same whatever the number of spectators. Every spectator is fed
+    from the journal at its own pace, and gets a new snapshot if it falls
+    behind the bytes that are kept.
+    '''
+
+    def __init__(self, history: int = 1 << 20):
+        self.__history = history
+        self.__lock = threading.Lock()
+        self.__state = BoardState()
+        self.__journal = bytearray()
+        # Stream offset of the first byte of the journal
+        self.__base = 0
+
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__changed: Optional[asyncio.Event] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__writers: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    def spectators(self) -> int:
+        return len(self.__writers)
+
+    def publish(self, data: bytes):
+        '''Sends a delta frame, may be called from any thread'''
+        with self.__lock:
+            for kind, payload in split_frames(data)[0]:
+                self.__state.apply(kind, payload)
+            self.__journal += data
+            if len(self.__journal) > self.__history:
+                dropped = len(self.__journal) - self.__history // 2
+                del self.__journal[:dropped]
+                self.__base += dropped
+        if self.__loop is not None:
+            self.__loop.call_soon_threadsafe(self.__wake)
+
+    def snapshot(self) -> Tuple[bytes, int]:
+        '''Whole state and the stream offset it matches'''
+        with self.__lock:
+            return frame(SNAPSHOT, self.__state.encode()), self.__base + len(self.__journal)
+
+    def read(self, offset: int) -> Optional[Tuple[bytes, int]]:
+        '''Deltas published since the offset, None when they were dropped'''
+        ret = None
+        with self.__lock:
+            if offset >= self.__base:
+                ret = bytes(self.__journal[offset - self.__base:]), self.__base + len(self.__journal)
+        return ret
+
+    def start(self, host: str, port: int) -> bool:
+        '''Accepts spectators on a background thread, False if the server cannot start'''
+        ready = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, args=(host, port, ready), name="Publisher", daemon=True)
+        self.__thread.start()
+        ready.wait()
+        return self.__loop is not None
+
+    def stop(self):
+        if self.__loop is not None:
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+            self.__thread.join()
+            self.__thread = None
+
+    def __run(self, host: str, port: int, ready: threading.Event):
+        loop = asyncio.new_event_loop()
+        # Before Python 3.10 the events bind to the current loop of the thread when created
+        asyncio.set_event_loop(loop)
+        try:
+            self.__changed = asyncio.Event()
+            try:
+                server = loop.run_until_complete(asyncio.start_server(self.__serve, host, port))
+            except OSError as e:
+                logging.warning("Cannot publish on %s:%d: %s", host, port, e)
+                return
+            logging.info("Publishing on %s", ", ".join(str(s.getsockname()) for s in server.sockets))
+            self.__loop = loop
+            ready.set()
+            loop.run_forever()
+            server.close()
+            # Closed writers end their spectator loop once woken up
+            tasks = list(self.__writers.values())
+            for writer in self.__writers:
+                writer.close()
+            self.__wake()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            self.__loop = None
+            ready.set()
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    def __wake(self):
+        changed = self.__changed
+        self.__changed = asyncio.Event()
+        changed.set()
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.__writers[writer] = asyncio.current_task()
+        try:
+            data, offset = self.snapshot()
+            writer.write(data)
+            while not writer.is_closing():
+                changed = self.__changed
+                deltas = self.read(offset)
+                if deltas is None:
+                    data, offset = self.snapshot()
+                else:
+                    data, offset = deltas
+                if data:
+                    writer.write(data)
+                    await writer.drain()
+                else:
+                    await changed.wait()
+        except ConnectionError:
+            pass
+        finally:
+            del self.__writers[writer]
+            writer.close()
+
+
+class Broadcaster(Listener):
+    '''Publishes the events of a match as deltas for the spectators'''
+
+    def __init__(self, publisher: Publisher, match: Match, colors: Optional[List[int]] = None):
+        self.__publisher = publisher
+        self.__match = match
+        teams = match.teams()
+        self.__skips = [team.skip_turn for team in teams]
+
+        state = BoardState()
+        state.names = [team.name() for team in teams]
+        state.colors = colors if colors is not None else [0xFFFFFFFF] * len(teams)
+        state.positions = [team.idx for team in teams]
+        state.skips = list(self.__skips)
+        state.turn = match.turn()
+        state.team = teams.index(match.current_team()) if teams else 0
+        winner = match.winner()
+        state.winner = teams.index(winner) if winner is not None else None
+        publisher.publish(frame(SNAPSHOT, state.encode()))
+
+    def team_moved(self, team: TeamState, idx: int):
+        self.__publisher.publish(encode_moved(self.__index(team), idx))
+
+    def turn_skipped(self, team: TeamState):
+        self.__publisher.publish(encode_team(SKIPPED, self.__index(team)))
+
+    def answered(self, team: TeamState, result: bool):
+        self.__publisher.publish(encode_pair(ANSWERED, self.__index(team), int(result)))
+
+    def winner(self, team: TeamState):
+        self.__publisher.publish(encode_team(WINNER, self.__index(team)))
+
+    def requested(self, request: Request):
+        subject = request.subject.idx() if isinstance(request.subject, BankQuiz) else -1
+        self.__publisher.publish(encode_requested(request.kind, self.__index(request.team), subject))
+
+    def received(self, request: Request, value: Any):
+        self.__publisher.publish(encode_requested(None, self.__index(request.team)))
+
+    def turn_finished(self, team: TeamState):
+        teams = self.__match.teams()
+        data = bytearray()
+        for i, state in enumerate(teams):
+            if state.skip_turn != self.__skips[i]:
+                self.__skips[i] = state.skip_turn
+                data += encode_pair(SKIP, i, int(state.skip_turn))
+        # Sent before the match moves on to the next team
+        data += frame(TURN, _TURN.pack(self.__match.turn() + 1, (self.__index(team) + 1) % len(teams)))
+        self.__publisher.publish(bytes(data))
+
+    def __index(self, team: TeamState) -> int:
+        return self.__match.teams().index(team)
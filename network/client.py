@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+from network.protocol import JOIN, ROLL, ANSWER, STATE, ERROR, ProtocolError, SessionState, read_frame, \
+    encode_open, encode_name, encode_value, decode_state
+
+
+class Controller:
+    '''Remote controller of a session hosted by a GameServer'''
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.__reader = reader
+        self.__writer = writer
+
+    @staticmethod
+    async def connect(host: str, port: int) -> Controller:
+        reader, writer = await asyncio.open_connection(host, port)
+        return Controller(reader, writer)
+
+    async def open(self, session: str, teams: List[str]) -> SessionState:
+        '''Joins a session, creating it with the given teams when it does not exist'''
+        self.__writer.write(encode_open(session, teams))
+        return await self.state()
+
+    async def join(self, session: str) -> SessionState:
+        self.__writer.write(encode_name(JOIN, session))
+        return await self.state()
+
+    async def roll(self, value: int = 0) -> SessionState:
+        '''Sends a dice value, 0 lets the server roll the dice'''
+        self.__writer.write(encode_value(ROLL, value))
+        return await self.state()
+
+    async def answer(self, passed: bool) -> SessionState:
+        self.__writer.write(encode_value(ANSWER, int(passed)))
+        return await self.state()
+
+    async def state(self) -> SessionState:
+        '''Waits for the next state of the session'''
+        kind, payload = await read_frame(self.__reader)
+        while kind != STATE:
+            if kind == ERROR:
+                raise ProtocolError(payload.decode("utf-8"))
+            kind, payload = await read_frame(self.__reader)
+        return decode_state(payload)
+
+    async def close(self):
+        self.__writer.close()
+        await self.__writer.wait_closed()
@@ -0,0 +1,143 @@
+'''Framed messages exchanged by the game server and its controllers.
+
+Every frame is a one byte kind and a two bytes payload length, followed by
+the payload.
+'''
+
+from __future__ import annotations
+
+import asyncio
+import struct
+from typing import List, Optional, Tuple
+
+from engine.rules import Request
+
+# Controller to server
+OPEN = 1        # session name, then the team names, separated by newlines
+JOIN = 2        # session name
+ROLL = 3        # dice value, 0 lets the server roll
+ANSWER = 4      # 1 when the quiz or challenge was passed
+
+# Server to controller
+STATE = 16
+ERROR = 17      # message
+
+# Publisher to spectators
+SNAPSHOT = 32   # whole match, see BoardState
+MOVED = 33      # team, box
+SKIP = 34       # team, whether the next turn of the team is skipped
+REQUESTED = 35  # pending request, or 0 when none, and its team
+ANSWERED = 36   # team, result
+SKIPPED = 37    # team
+WINNER = 38     # team
+TURN = 39       # turn, current team
+
+MAX_PAYLOAD = 0xFFFF
+NOBODY = 0xFF
+
+_HEADER = struct.Struct("<BH")
+_STATE = struct.Struct("<IBBB")
+_POSITION = struct.Struct("<H")
+_VALUE = struct.Struct("<B")
+
+_PENDING = {None: 0, Request.Kind.ROLL: 1, Request.Kind.QUIZ: 2, Request.Kind.CHALLENGE: 3}
+_KINDS = {code: kind for kind, code in _PENDING.items()}
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class FrameReader:
+    '''Splits a byte stream into frames, for sockets that are not asyncio streams'''
+
+    def __init__(self):
+        self.__buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Tuple[int, bytes]]:
+        self.__buffer += data
+        ret, length = split_frames(self.__buffer)
+        del self.__buffer[:length]
+        return ret
+
+
+class SessionState:
+    '''Snapshot of a session as seen by the controllers'''
+
+    def __init__(self, turn: int, team: int, pending: Optional[Request.Kind], winner: Optional[int],
+                 positions: List[int]):
+        self.turn = turn
+        self.team = team
+        self.pending = pending
+        self.winner = winner
+        self.positions = positions
+
+
+def frame(kind: int, payload: bytes = b"") -> bytes:
+    if len(payload) > MAX_PAYLOAD:
+        raise ProtocolError("Payload of {} bytes is too long".format(len(payload)))
+    return _HEADER.pack(kind, len(payload)) + payload
+
+
+def split_frames(data: bytes) -> Tuple[List[Tuple[int, bytes]], int]:
+    '''Complete frames at the start of the data, and their length in bytes'''
+    frames = []
+    pos = 0
+    while pos + _HEADER.size <= len(data):
+        kind, length = _HEADER.unpack_from(data, pos)
+        end = pos + _HEADER.size + length
+        if end > len(data):
+            break
+        frames.append((kind, bytes(data[pos + _HEADER.size:end])))
+        pos = end
+    return frames, pos
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    kind, length = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    payload = await reader.readexactly(length) if length else b""
+    return kind, payload
+
+
+def encode_open(session: str, teams: List[str]) -> bytes:
+    return frame(OPEN, "\n".join([session] + teams).encode("utf-8"))
+
+
+def decode_open(payload: bytes) -> Tuple[str, List[str]]:
+    names = payload.decode("utf-8").split("\n")
+    return names[0], names[1:]
+
+
+def encode_name(kind: int, name: str) -> bytes:
+    return frame(kind, name.encode("utf-8"))
+
+
+def encode_value(kind: int, value: int) -> bytes:
+    return frame(kind, _VALUE.pack(value))
+
+
+def decode_value(payload: bytes) -> int:
+    if len(payload) != _VALUE.size:
+        raise ProtocolError("Expected a one byte value")
+    return _VALUE.unpack(payload)[0]
+
+
+def pending_code(kind: Optional[Request.Kind]) -> int:
+    return _PENDING[kind]
+
+
+def pending_kind(code: int) -> Optional[Request.Kind]:
+    return _KINDS[code]
+
+
+def encode_state(state: SessionState) -> bytes:
+    winner = NOBODY if state.winner is None else state.winner
+    payload = _STATE.pack(state.turn, state.team, _PENDING[state.pending], winner) + \
+        b"".join(_POSITION.pack(idx) for idx in state.positions)
+    return frame(STATE, payload)
+
+
+def decode_state(payload: bytes) -> SessionState:
+    turn, team, pending, winner = _STATE.unpack_from(payload, 0)
+    positions = [idx for idx, in _POSITION.iter_unpack(payload[_STATE.size:])]
+    return SessionState(turn, team, _KINDS[pending], None if winner == NOBODY else winner, positions)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from logging import getLogger
+
+from engine.board import Board
+from engine.eventlog import EventLog
+from network.protocol import OPEN, JOIN, ROLL, ANSWER, ERROR, ProtocolError, read_frame, decode_open, \
+    decode_value, encode_name
+from network.session import Session, Subscriber
+
+logging = getLogger(__name__)
+
+# Bytes queued for a controller that does not read its states any more
+MAX_BUFFER = 1 << 20
+
+# Seconds an unfinished session is kept without any controller
+IDLE_TIMEOUT = 300
+
+SESSION_NAME = re.compile(r"[A-Za-z0-9_\-]{1,64}")
+
+
+class Connection(Subscriber):
+    '''Controller connected to the server, attached to at most one session'''
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.__writer = writer
+        self.session: Optional[Session] = None
+
+    def send(self, data: bytes):
+        transport = self.__writer.transport
+        if not transport.is_closing():
+            if transport.get_write_buffer_size() > MAX_BUFFER:
+                logging.warning("Dropping a slow controller")
+                transport.abort()
+            else:
+                self.__writer.write(data)
+
+    def close(self):
+        self.__writer.close()
+
+
+class GameServer:
+    '''Hosts many sessions on one board, played by remote controllers.
+
+    Everything runs on the event loop: an input is applied and the new state
+    sent to every controller of the session before the next frame is read.
+    '''
+
+    def __init__(self, board: Board, log_dir: Optional[str] = None, max_sessions: int = 1000,
+                 faces: int = 6, idle_timeout: float = IDLE_TIMEOUT):
+        self.__board = board
+        self.__log_dir = log_dir
+        self.__max_sessions = max_sessions
+        self.__faces = faces
+        self.__idle_timeout = idle_timeout
+        self.__sessions: Dict[str, Session] = {}
+        self.__logs: Dict[str, EventLog] = {}
+        self.__expiries: Dict[str, asyncio.TimerHandle] = {}
+        # Syncs the logs to disk off the event loop, a slow disk must not stall every session
+        self.__log_writer = ThreadPoolExecutor(max_workers=4, thread_name_prefix="LogSync")
+
+    def sessions(self) -> Dict[str, Session]:
+        return self.__sessions
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        ret = await asyncio.start_server(self.__serve, host, port)
+        logging.info("Serving on %s", ", ".join(str(s.getsockname()) for s in ret.sockets))
+        return ret
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(writer)
+        try:
+            while True:
+                kind, payload = await read_frame(reader)
+                try:
+                    self.__dispatch(connection, kind, payload)
+                except (ProtocolError, ValueError) as e:
+                    connection.send(encode_name(ERROR, str(e)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.__leave(connection)
+            connection.close()
+
+    def __dispatch(self, connection: Connection, kind: int, payload: bytes):
+        if kind == OPEN:
+            name, teams = decode_open(payload)
+            session = self.__sessions.get(name)
+            if session is None:
+                session = self.__open(name, teams)
+            self.__join(connection, session)
+        elif kind == JOIN:
+            name = payload.decode("utf-8")
+            if name not in self.__sessions:
+                raise ProtocolError("No session named {}".format(name))
+            self.__join(connection, self.__sessions[name])
+        elif kind in (ROLL, ANSWER):
+            session = connection.session
+            if session is None:
+                raise ProtocolError("Not in a session")
+            value = decode_value(payload)
+            done = session.roll(value) if kind == ROLL else session.answer(bool(value))
+            if not done:
+                raise ProtocolError("Session {} is not waiting for this input".format(session.name()))
+        else:
+            raise ProtocolError("Unknown message {}".format(kind))
+
+    def __open(self, name: str, teams) -> Session:
+        if not SESSION_NAME.fullmatch(name):
+            raise ProtocolError("Invalid session name {}".format(name))
+        if len(self.__sessions) >= self.__max_sessions:
+            raise ProtocolError("Too many sessions")
+
+        ret = Session(name, self.__board, teams, faces=self.__faces)
+        if self.__log_dir is not None:
+            log = EventLog(os.path.join(self.__log_dir, name + ".log"), self.__log_writer)
+            log.start(ret.match().teams())
+            ret.match().add_listener(log)
+            self.__logs[name] = log
+        self.__sessions[name] = ret
+        logging.info("Opened session %s with %d teams", name, len(teams))
+        return ret
+
+    def __join(self, connection: Connection, session: Session):
+        self.__leave(connection)
+        expiry = self.__expiries.pop(session.name(), None)
+        if expiry is not None:
+            expiry.cancel()
+        connection.session = session
+        session.subscribe(connection)
+
+    def __leave(self, connection: Connection):
+        session = connection.session
+        if session is not None:
+            session.unsubscribe(connection)
+            connection.session = None
+            # Finished sessions go away with their last controller, the others
+            # after a while if nobody joins them again
+            if not session.subscribers():
+                if session.match().winner() is not None:
+                    self.__close(session.name())
+                else:
+                    self.__expiries[session.name()] = asyncio.get_running_loop().call_later(
+                        self.__idle_timeout, self.__expire, session.name())
+
+    def __expire(self, name: str):
+        logging.info("Session %s left without controllers", name)
+        self.__close(name)
+
+    def __close(self, name: str):
+        expiry = self.__expiries.pop(name, None)
+        if expiry is not None:
+            expiry.cancel()
+        del self.__sessions[name]
+        log = self.__logs.pop(name, None)
+        if log is not None:
+            # Waits for the pending syncs of the log
+            self.__log_writer.submit(log.close)
+        logging.info("Closed session %s", name)
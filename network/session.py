@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional
+from logging import getLogger
+
+from engine.board import Board
+from engine.match import Dice, Listener, Match, RandomDice, TeamState
+from engine.rules import Request, Step
+from network.protocol import ProtocolError, SessionState, encode_state
+
+logging = getLogger(__name__)
+
+
+class Subscriber(ABC):
+    '''Receives the encoded state of a session whenever it changes'''
+
+    @abstractmethod
+    def send(self, data: bytes):
+        pass
+
+
+class Session:
+    '''Match hosted by the server, played with the inputs of its controllers.
+
+    The turns are started as soon as the previous one finishes, so the
+    session is always waiting for a known request until there is a winner.
+    '''
+
+    def __init__(self, name: str, board: Board, teams: List[str],
+                 dice: Optional[Dice] = None, listener: Optional[Listener] = None, faces: int = 6):
+        if not teams:
+            raise ValueError("A session needs at least one team")
+        self.__name = name
+        self.__faces = faces
+        self.__dice = dice if dice is not None else RandomDice(faces=faces)
+        self.__match = Match(board, listener=listener)
+        for team in teams:
+            self.__match.add_team(TeamState(team))
+
+        self.__subscribers: List[Subscriber] = []
+        self.__steps: Optional[Step] = None
+        self.__request: Optional[Request] = None
+        self.__advance(None)
+
+    def name(self) -> str:
+        return self.__name
+
+    def match(self) -> Match:
+        return self.__match
+
+    def pending(self) -> Optional[Request]:
+        return self.__request
+
+    def subscribers(self) -> List[Subscriber]:
+        return self.__subscribers
+
+    def subscribe(self, subscriber: Subscriber):
+        self.__subscribers.append(subscriber)
+        subscriber.send(encode_state(self.state()))
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if subscriber in self.__subscribers:
+            self.__subscribers.remove(subscriber)
+
+    def state(self) -> SessionState:
+        teams = self.__match.teams()
+        winner = self.__match.winner()
+        return SessionState(self.__match.turn(),
+                            teams.index(self.__match.current_team()),
+                            self.__request.kind if self.__request is not None else None,
+                            teams.index(winner) if winner is not None else None,
+                            [team.idx for team in teams])
+
+    def roll(self, value: int) -> bool:
+        '''Moves the current team by a value from 1 to the faces of the dice, 0 rolls the dice of the session'''
+        if not (0 <= value <= self.__faces):
+            raise ProtocolError("Dice value {} is not between 1 and {}".format(value, self.__faces))
+        ret = False
+        request = self.__request
+        if (request is not None) and (request.kind == Request.Kind.ROLL):
+            if value == 0:
+                value = self.__dice.roll(request.team)
+            self.__advance(value)
+            ret = True
+        return ret
+
+    def answer(self, passed: bool) -> bool:
+        ret = False
+        request = self.__request
+        if (request is not None) and (request.kind != Request.Kind.ROLL):
+            self.__advance(passed)
+            ret = True
+        return ret
+
+    def __advance(self, value: Any):
+        self.__request = None
+        # Skipped turns end without any input, but a team never skips two turns in a row
+        for _ in range(2 * len(self.__match.teams()) + 1):
+            try:
+                if self.__steps is None:
+                    if self.__match.winner() is not None:
+                        break
+                    self.__steps = self.__match.steps()
+                    self.__request = next(self.__steps)
+                else:
+                    self.__request = self.__steps.send(value)
+                break
+            except StopIteration:
+                self.__steps = None
+                value = None
+
+        data = encode_state(self.state())
+        for subscriber in list(self.__subscribers):
+            subscriber.send(data)
@@ -0,0 +1,26 @@
+import argparse
+import logging
+import os
+import struct
+import sys
+
+from engine.quizbank import build_bank, open_bank
+
+'''Compiles quiz banks for the quiz boxes that draw their questions'''
+if __name__ == "__main__":
+
+    logging.basicConfig(format='%(asctime)s %(threadName)s %(module)s: %(message)s', level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Compile the quiz elements of an XML file into a quiz bank")
+    parser.add_argument("source", help="XML file with quiz elements, e.g. a board")
+    parser.add_argument("-o", "--output", help="bank file (default: the source with a .qzb extension)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.source)[0] + ".qzb"
+    try:
+        count = build_bank(args.source, output)
+    except (OSError, ValueError, struct.error) as e:
+        sys.exit("Cannot build quiz bank: {}".format(e))
+
+    bank = open_bank(output)
+    logging.info("Wrote %d quizzes in %d categories to %s", count, len(bank.categories()), output)
@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+from engine.board import Board
+from network.server import IDLE_TIMEOUT, GameServer
+
+
+async def serve(server: GameServer, host: str, port: int):
+    listener = await server.start(host, port)
+    async with listener:
+        await listener.serve_forever()
+
+
+'''Game server for remote controllers'''
+if __name__ == "__main__":
+
+    logging.basicConfig(format='%(asctime)s %(threadName)s %(module)s: %(message)s', level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Host game sessions played by remote controllers")
+    parser.add_argument("board", nargs="?", default="game.xml", help="board XML file")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on, 0.0.0.0 for the LAN")
+    parser.add_argument("--port", type=int, default=7460)
+    parser.add_argument("--max-sessions", type=int, default=1000)
+    parser.add_argument("--faces", type=int, default=6, help="faces of the dice")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="seconds an unfinished session is kept once its last controller leaves")
+    parser.add_argument("--log-dir", help="directory for the event log of each session")
+    args = parser.parse_args()
+
+    board = Board()
+    if not board.load(args.board):
+        sys.exit("Cannot load board {}".format(args.board))
+    if args.log_dir is not None:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    try:
+        server = GameServer(board, args.log_dir, args.max_sessions, args.faces, args.idle_timeout)
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
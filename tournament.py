@@ -0,0 +1,111 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any
+
+import numpy as np
+
+from engine.board import Board
+from engine.simulator import Simulator
+
+
+def shuffled(board: Board, seed: int) -> Board:
+    '''Board variant with the boxes between start and finish in a random order'''
+    boxes = board.boxes()
+    middle = boxes[1:-1]
+    random.Random(seed).shuffle(middle)
+    variant = Board()
+    for box in [boxes[0]] + middle + [boxes[-1]]:
+        variant.add_box(box)
+    return variant
+
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    board = Board()
+    if not board.load(job["board"]):
+        raise ValueError("Cannot load board {}".format(job["board"]))
+    if job["variant"] > 0:
+        board = shuffled(board, job["shuffle_seed"])
+
+    simulator = Simulator(board,
+                          job["teams"],
+                          job["quiz_probability"],
+                          job["challenge_probability"],
+                          job["seed"])
+    result = simulator.run(job["games"], job["max_turns"])
+    rounds = result.rounds()
+
+    report = dict(job)
+    report["boxes"] = " ".join(box.tag for box in board.boxes())
+    report["unfinished"] = int(np.count_nonzero(result.winners() < 0))
+    for team, rate in enumerate(result.win_rates()):
+        report["win_rate_{}".format(team)] = float(rate)
+    report["mean_rounds"] = float(rounds.mean())
+    report["std_rounds"] = float(rounds.std())
+    report["median_rounds"] = float(np.median(rounds))
+    report["p90_rounds"] = float(np.percentile(rounds, 90))
+    report["mean_turns"] = float(result.turns().mean())
+    report["visits"] = " ".join(str(v) for v in (result.visits() / result.games()).round(4))
+    return report
+
+
+def write_report(reports: List[Dict[str, Any]], output: str):
+    out = open(output, "w", newline="") if output != "-" else sys.stdout
+    try:
+        if output.endswith(".json"):
+            json.dump(reports, out, indent=2)
+        else:
+            writer = csv.DictWriter(out, fieldnames=list(reports[0].keys()))
+            writer.writeheader()
+            writer.writerows(reports)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+'''Simulated tournaments over many boards and board variants'''
+if __name__ == "__main__":
+
+    logging.basicConfig(format='%(asctime)s %(threadName)s %(module)s: %(message)s', level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Run simulated tournaments on game boards")
+    parser.add_argument("boards", nargs="+", help="board XML files")
+    parser.add_argument("--variants", type=int, default=0,
+                        help="number of random box orders to try per board, besides the original one")
+    parser.add_argument("--quiz-probability", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--challenge-probability", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--teams", type=int, default=4)
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--max-turns", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("-o", "--output", default="-", help="report file, .json or .csv (default: CSV on stdout)")
+    args = parser.parse_args()
+
+    jobs = []
+    for board_idx, board in enumerate(args.boards):
+        for variant in range(args.variants + 1):
+            # The same variant is played with every probability, only the simulations differ
+            shuffle_seed = args.seed + board_idx * (args.variants + 1) + variant
+            for quiz_probability in args.quiz_probability:
+                for challenge_probability in args.challenge_probability:
+                    jobs.append({"board": board,
+                                 "variant": variant,
+                                 "shuffle_seed": shuffle_seed,
+                                 "quiz_probability": quiz_probability,
+                                 "challenge_probability": challenge_probability,
+                                 "teams": args.teams,
+                                 "games": args.games,
+                                 "max_turns": args.max_turns,
+                                 "seed": args.seed + len(jobs)})
+
+    logging.info("Running %d jobs on %d workers", len(jobs), args.workers)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        reports = list(executor.map(run_job, jobs))
+
+    write_report(reports, args.output)